@@ -91,7 +91,10 @@ def run_cli(
     else:
         raise ValueError(f"Unknown activity '{subparser_name}'.")
 
-    result = manage_item.run()
+    try:
+        result = manage_item.run()
+    finally:
+        manage_item.close()
 
     return 0 if result else 1
 
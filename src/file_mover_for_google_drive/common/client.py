@@ -2,10 +2,10 @@
 import logging
 import typing
 
+import google_auth_httplib2
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib import flow
-from googleapiclient import discovery, errors
+from googleapiclient import discovery, errors, http
 
 from file_mover_for_google_drive.common import models
 
@@ -27,19 +27,22 @@ class GoogleApiClient:
         self._scopes = scopes
         self._client_args = client_args
         self._client = existing_client
+        self._has_existing_client = existing_client is not None
+        self._creds: typing.Optional[Credentials] = None
 
     def _authorise(self):
         """Authorise access to the Google API."""
-        creds = None
+        creds = self._creds
+        if creds and creds.valid:
+            return creds
 
         # The file token.json stores the user's access and refresh tokens, and is
         # created automatically when the authorization flow completes for the first
         # time.
-        if self._config.auth.token_file.exists():
+        token_file = self._config.auth.token_file
+        if not creds and token_file.exists():
             logger.debug("Using existing token.")
-            creds = Credentials.from_authorized_user_file(
-                str(self._config.auth.token_file), self._scopes
-            )
+            creds = Credentials.from_authorized_user_file(str(token_file), self._scopes)
 
         # If there are no (valid) credentials available, prompt the user to log in.
         if not creds or not creds.valid:
@@ -48,15 +51,22 @@ class GoogleApiClient:
                 creds.refresh(Request())
             else:
                 logger.info("Starting authorisation flow.")
+
+                # The authorisation flow is only needed when there is no usable token.
+                from google_auth_oauthlib import flow
+
                 flow_result = flow.InstalledAppFlow.from_client_secrets_file(
                     str(self._config.auth.credentials_file), self._scopes
                 )
                 creds = flow_result.run_local_server(port=0)
 
-            # Save the credentials for the next run
-            logger.info("Saving credentials to token.json file.")
-            self._config.auth.token_file.write_text(creds.to_json())
+            # Save the credentials for the next run, if they have changed
+            creds_json = creds.to_json()
+            if not token_file.exists() or token_file.read_text() != creds_json:
+                logger.info("Saving credentials to token.json file.")
+                token_file.write_text(creds_json)
 
+        self._creds = creds
         return creds
 
     def client(self) -> discovery.Resource:
@@ -66,9 +76,10 @@ class GoogleApiClient:
             return self._client
 
         creds = self._authorise()
+        authed_http = self._build_http(creds)
 
         try:
-            params = {**self._client_args, "credentials": creds}
+            params = {**self._client_args, "http": authed_http}
             self._client = discovery.build(**params)
 
             logger.debug("Created new client.")
@@ -77,6 +88,41 @@ class GoogleApiClient:
 
         return self._client
 
+    @property
+    def can_build_http(self) -> bool:
+        """Whether new http transports can be built for other threads.
+
+        Returns:
+            False if an existing client was provided, as there are no credentials.
+        """
+        return not self._has_existing_client
+
+    def new_http(self) -> typing.Optional[google_auth_httplib2.AuthorizedHttp]:
+        """Build a new authorised http transport.
+
+        The http transport is not thread-safe,
+        so each thread that sends requests needs its own transport.
+
+        Returns:
+            A new http transport, or None if an existing client was provided.
+        """
+        if self._creds is None:
+            # an existing client was provided, so there are no credentials
+            return None
+        return self._build_http(self._creds)
+
+    def _build_http(self, creds: Credentials) -> google_auth_httplib2.AuthorizedHttp:
+        """Build an authorised http transport.
+
+        Args:
+            creds: The authorised credentials.
+
+        Returns:
+            The http transport.
+        """
+        # the client library's default transport, which has a 60 second timeout
+        return google_auth_httplib2.AuthorizedHttp(creds, http=http.build_http())
+
     @classmethod
     def get_drive_client(
         cls,
@@ -115,7 +161,7 @@ class GoogleApiClient:
             "version": "v3",
             # NOTE: Tried to use the MemoryCache,
             # but the cache does not seem to be used?
-            # https://github.com/googleapis/google-api-python-client/issues/325#issuecomment-274349841
+            # https://github.com/googleapis/google-api-python-client/issues/325#issuecomment-274349841  # noqa: E501
             "cache_discovery": False,
         }
         return GoogleApiClient(config, scopes, client_args, existing_client)
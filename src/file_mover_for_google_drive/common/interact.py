@@ -1,19 +1,43 @@
 """The Google Drive API interaction classes."""
 
+import collections
+import concurrent.futures
 import datetime
 import itertools
 import json
 import logging
 import pathlib
+import random
+import threading
+import time
 import typing
 
 from googleapiclient import discovery, http
 from googleapiclient.errors import HttpError
 
 from file_mover_for_google_drive.common import models, client, utils
+from file_mover_for_google_drive.common.models import (
+    _PROPERTY_KEY_COPY_FILE_ID,
+    _PROPERTY_KEY_ORIGINAL_FILE_ID,
+)
+
+try:
+    # optional faster json encoding for the request and response debug files
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+_ACCOUNT_PERSONAL = models.GoogleDriveAccountTypeOptions.PERSONAL
+_ACCOUNT_BUSINESS = models.GoogleDriveAccountTypeOptions.BUSINESS
+_MIME_TYPE_DIR = models.GoogleDriveEntry.mime_type_dir()
+_QUERY_NOT_TRASHED = "trashed=false"
+# escape the backslashes and single quotes in a query string value
+_QUERY_ESCAPE = str.maketrans({"\\": "\\\\", "'": "\\'"})
+# identifies the permissions of an entry: the modified time and the permission ids
+_PermissionsKey = typing.Optional[tuple[typing.Optional[str], tuple[str, ...]]]
+
 
 class GoogleDriveApi:
     """Provides access to the Google Drive API v3.
@@ -35,9 +59,41 @@ class GoogleDriveApi:
         Args:
             config: The program configuration.
             gd_client: The Google Drive client.
+
+        Raises:
+            ValueError: The performance settings use more than one thread,
+                and the client cannot build an http transport for each thread.
         """
         self._config = config
         self._client = gd_client
+        self._resolved_client: typing.Optional[discovery.Resource] = None
+        self._files_resource: typing.Optional[discovery.Resource] = None
+        self._permissions_resource: typing.Optional[discovery.Resource] = None
+        self._thread_local = threading.local()
+        self._prefetch: typing.Optional[concurrent.futures.Executor] = None
+        self._prefetch_lock = threading.Lock()
+
+        performance = config.performance
+
+        # Each thread that sends requests needs its own http transport,
+        # so check this now instead of failing part way through getting entries.
+        uses_threads = performance.num_workers > 1 or performance.entries_buffer > 0
+        if uses_threads and not (gd_client and gd_client.can_build_http):
+            raise ValueError(
+                "Cannot send requests from more than one thread "
+                "without credentials to build an http transport for each thread. "
+                "Set num_workers to 1 and entries_buffer to 0."
+            )
+
+        self._pacer = utils.TokenBucket(
+            rate=performance.requests_per_second, burst=performance.requests_burst
+        )
+
+        # Limit the number of requests sent at the same time by the worker threads,
+        # reducing the limit when requests are rate limited.
+        self._limiter: typing.Optional[utils.ConcurrencyLimit] = None
+        if performance.num_workers > 1:
+            self._limiter = utils.ConcurrencyLimit(performance.num_workers)
 
     @property
     def config(self) -> models.ConfigProgram:
@@ -57,9 +113,39 @@ class GoogleDriveApi:
         Returns:
             The Google Drive client.
         """
-        if not self._client:
-            raise ValueError("No client available.")
-        return self._client.client()
+        # The client refreshes the credentials when needed,
+        # so it only needs to be obtained once.
+        resolved_client = self._resolved_client
+        if resolved_client is None:
+            if not self._client:
+                raise ValueError("No client available.")
+            resolved_client = self._client.client()
+            self._resolved_client = resolved_client
+        return resolved_client
+
+    @property
+    def files(self) -> discovery.Resource:
+        """
+        Get the Google Drive files resource.
+
+        Returns:
+            The files resource.
+        """
+        if self._files_resource is None:
+            self._files_resource = self.client.files()
+        return self._files_resource
+
+    @property
+    def permissions(self) -> discovery.Resource:
+        """
+        Get the Google Drive permissions resource.
+
+        Returns:
+            The permissions resource.
+        """
+        if self._permissions_resource is None:
+            self._permissions_resource = self.client.permissions()
+        return self._permissions_resource
 
     def files_get(self, *args: tuple[typing.Any], **kwargs) -> http.HttpRequest:
         """
@@ -72,7 +158,7 @@ class GoogleDriveApi:
         Returns:
             A file get operation.
         """
-        return self.client.files().get(*args, **kwargs)
+        return self.files.get(*args, **kwargs)
 
     def files_list(self, *args: tuple[typing.Any], **kwargs) -> http.HttpRequest:
         """
@@ -85,7 +171,7 @@ class GoogleDriveApi:
         Returns:
             A file list operation.
         """
-        return self.client.files().list(*args, **kwargs)
+        return self.files.list(*args, **kwargs)
 
     def files_create(self, *args: tuple[typing.Any], **kwargs) -> http.HttpRequest:
         """
@@ -98,26 +184,26 @@ class GoogleDriveApi:
         Returns:
             A file create operation.
         """
-        return self.client.files().create(*args, **kwargs)
+        return self.files.create(*args, **kwargs)
 
     def files_copy(self, *args: tuple[typing.Any], **kwargs):
-        return self.client.files().copy(*args, **kwargs)
+        return self.files.copy(*args, **kwargs)
 
     def files_update(self, *args: tuple[typing.Any], **kwargs) -> http.HttpRequest:
-        return self.client.files().update(*args, **kwargs)
+        return self.files.update(*args, **kwargs)
 
     def permissions_delete(
         self, *args: tuple[typing.Any], **kwargs
     ) -> http.HttpRequest:
-        return self.client.permissions().delete(*args, **kwargs)
+        return self.permissions.delete(*args, **kwargs)
 
     def permissions_update(
         self, *args: tuple[typing.Any], **kwargs
     ) -> http.HttpRequest:
-        return self.client.permissions().update(*args, **kwargs)
+        return self.permissions.update(*args, **kwargs)
 
     def permissions_list(self, *args: tuple[typing.Any], **kwargs) -> http.HttpRequest:
-        return self.client.permissions().list(*args, **kwargs)
+        return self.permissions.list(*args, **kwargs)
 
     def execute_single(self, request: http.HttpRequest) -> typing.Mapping:
         """Execute an operation that returns a single response.
@@ -143,30 +229,7 @@ class GoogleDriveApi:
             An iterable of zero, one, or more file items.
         """
 
-        page_count = 0
-        while request is not None:
-            page_count += 1
-
-            response = self._do_execute(request)
-
-            if not response:
-                raise ValueError(
-                    f"Expected a response for request '{self._request_display(request)}'."
-                )
-
-            response_items = response.get("files", [])
-
-            logger.debug(
-                "Processing page %s with %s items from '%s'.",
-                page_count,
-                len(response_items),
-                self._request_display(request),
-            )
-
-            for entry_data in response_items:
-                yield entry_data
-
-            request = self.client.files().list_next(request, response)
+        return self._execute_pages(request, self.files.list_next, "files")
 
     def execute_permissions_list(
         self, request: http.HttpRequest
@@ -180,30 +243,206 @@ class GoogleDriveApi:
             An iterable of zero, one, or more permission items.
         """
 
-        page_count = 0
-        while request is not None:
-            page_count += 1
+        return self._execute_pages(request, self.permissions.list_next, "permissions")
 
-            response = self._do_execute(request)
+    def execute_files_list_batch(
+        self, requests: typing.Mapping[str, http.HttpRequest]
+    ) -> tuple[dict[str, list[typing.Mapping]], dict[str, HttpError]]:
+        """Execute many operations that return a list of files using batch requests.
 
-            if not response:
-                raise ValueError(
-                    f"Expected a response for request '{self._request_display(request)}'."
-                )
+        Args:
+            requests: The requests to execute by unique request id.
+
+        Returns:
+            The file items by request id, and the errors by request id.
+        """
+        return self._execute_pages_batch(requests, self.files.list_next, "files")
 
-            response_items = response.get("permissions", [])
+    def execute_permissions_list_batch(
+        self, requests: typing.Mapping[str, http.HttpRequest]
+    ) -> tuple[dict[str, list[typing.Mapping]], dict[str, HttpError]]:
+        """Execute many operations that return a list of permissions
+        using batch requests.
 
-            logger.debug(
-                "Processing page %s with %s items from '%s'.",
-                page_count,
-                len(response_items),
-                self._request_display(request),
+        Args:
+            requests: The requests to execute by unique request id.
+
+        Returns:
+            The permission items by request id, and the errors by request id.
+        """
+        return self._execute_pages_batch(
+            requests, self.permissions.list_next, "permissions"
+        )
+
+    def _execute_pages_batch(
+        self,
+        requests: typing.Mapping[str, http.HttpRequest],
+        list_next: typing.Callable[
+            [http.HttpRequest, typing.Mapping], typing.Optional[http.HttpRequest]
+        ],
+        items_key: str,
+    ) -> tuple[dict[str, list[typing.Mapping]], dict[str, HttpError]]:
+        """Execute many operations that return a list of items over one or more pages,
+        using batch requests.
+
+        The first page of every operation is requested,
+        then the next page of the operations that have more pages, and so on.
+
+        Args:
+            requests: The requests for the first pages by unique request id.
+            list_next: Builds the request for the next page.
+            items_key: The key in the response that contains the items.
+
+        Returns:
+            The items by request id, and the errors by request id.
+            An operation that failed is only included in the errors.
+        """
+        items: dict[str, list[typing.Mapping]] = {
+            request_id: [] for request_id in requests
+        }
+        errors: dict[str, HttpError] = {}
+
+        pending = dict(requests)
+        while pending:
+            logger.debug("Getting %s lists using batch requests.", len(pending))
+            next_pending: dict[str, http.HttpRequest] = {}
+
+            def _callback(
+                request_id: str,
+                response: typing.Any,
+                exception: typing.Optional[http.HttpError],
+            ) -> None:
+                if exception is not None:
+                    errors[request_id] = exception
+                    items.pop(request_id, None)
+                    return
+
+                items[request_id].extend(response.get(items_key, []))
+
+                # get the next page in the next round of batches
+                next_request = list_next(pending[request_id], response)
+                if next_request is not None:
+                    next_pending[request_id] = next_request
+
+            self.execute_batch(
+                list(pending.values()), _callback, request_ids=list(pending.keys())
             )
+            pending = next_pending
+
+        return items, errors
+
+    def _execute_pages(
+        self,
+        request: http.HttpRequest,
+        list_next: typing.Callable[
+            [http.HttpRequest, typing.Mapping], typing.Optional[http.HttpRequest]
+        ],
+        items_key: str,
+    ) -> typing.Iterable[typing.Mapping]:
+        """Execute an operation that returns a list of items over one or more pages.
+
+        When more than one worker is configured, the next page is requested
+        in the background while the items in the current page are processed.
+
+        Args:
+            request: The request for the first page.
+            list_next: Builds the request for the next page.
+            items_key: The key in the response that contains the items.
+
+        Returns:
+            An iterable of zero, one, or more items.
+        """
+        prefetch = self._config.performance.num_workers > 1
+        page_count = 0
+        next_future: typing.Optional[concurrent.futures.Future] = None
+        try:
+            while request is not None:
+                page_count += 1
+
+                if next_future is None:
+                    response = self._do_execute(request)
+                else:
+                    response = next_future.result()
+                    next_future = None
+
+                if not response:
+                    request_display = self._request_display(request)
+                    raise ValueError(
+                        f"Expected a response for request '{request_display}'."
+                    )
+
+                response_items = response.get(items_key, [])
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "Processing page %s with %s items from '%s'.",
+                        page_count,
+                        len(response_items),
+                        self._request_display(request),
+                    )
+
+                # start getting the next page
+                next_request = list_next(request, response)
+                if next_request is not None and prefetch:
+                    next_future = self._prefetch_executor().submit(
+                        self._do_execute, next_request
+                    )
+
+                yield from response_items
+
+                request = next_request
+        finally:
+            # the next page is not needed when the items are no longer wanted
+            if next_future is not None:
+                next_future.cancel()
+
+    def _prefetch_executor(self) -> concurrent.futures.Executor:
+        """Get the executor used to request the next page of a list.
 
-            for permission_data in response_items:
-                yield permission_data
+        Returns:
+            The executor.
+        """
+        # one worker for each thread that can be listing at the same time
+        with self._prefetch_lock:
+            if self._prefetch is None:
+                self._prefetch = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self._config.performance.num_workers,
+                    thread_name_prefix="file-mover-prefetch",
+                )
+            return self._prefetch
+
+    def close(self) -> None:
+        """Stop the background requests and release the worker threads.
 
-            request = self.client.permissions().list_next(request, response)
+        Returns:
+            None
+        """
+        with self._prefetch_lock:
+            prefetch = self._prefetch
+            self._prefetch = None
+        if prefetch is not None:
+            prefetch.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "GoogleDriveApi":
+        """Enter the runtime context.
+
+        Returns:
+            The GoogleDriveApi instance.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Exit the runtime context and stop any background requests.
+
+        Args:
+            exc_type: The exception type.
+            exc_val: The exception value.
+            exc_tb: The exception traceback.
+
+        Returns:
+            None
+        """
+        self.close()
 
     def execute_batch(
         self,
@@ -211,44 +450,149 @@ class GoogleDriveApi:
         callback: typing.Callable[
             [str, typing.Any, typing.Optional[http.HttpError]], None
         ],
-    ) -> None:
+        request_ids: typing.Optional[list[str]] = None,
+    ) -> set[str]:
         """Execute a batch of operations.
 
+        Operations that are rate limited are sent again in a later round of batches.
+
         Args:
             requests: The requests to execute as a batch.
             callback: The callback for the result of each request.
+            request_ids: The optional unique id for each request,
+                which is given to the callback.
+                Defaults to the position of the request, starting at '1'.
 
         Returns:
-            None
+            The request ids of the operations that failed.
         """
 
         # https://developers.google.com/drive/api/guides/performance#batch-requests
-        # https://developers.google.com/drive/api/guides/manage-sharing#change-multiple-permissions
+        # https://developers.google.com/drive/api/guides/manage-sharing#change-multiple-permissions  # noqa: E501
 
         # Batch requests with more than 100 calls may result in an error.
         # There is an 8000-character limit on the length
         # of the URL for each inner request.
         # Currently, Google Drive does not support batch operations for media,
         # either for upload or download.
-        operations_per_batch = 100
-        for index, operations_group in enumerate(
-            self._batched(requests, operations_per_batch)
-        ):
-            batch = self.client.new_batch_http_request(callback=callback)
-            for operation in operations_group:
-                if operation:
-                    batch.add(operation)
+        performance = self._config.performance
+        operations_per_batch = performance.operations_per_batch
+        if request_ids is None:
+            request_ids = [str(index + 1) for index in range(len(requests))]
+        if len(request_ids) != len(requests):
+            raise ValueError("Must provide one request id for each request.")
+
+        pending = dict(zip(request_ids, requests))
+        if len(pending) != len(requests):
+            raise ValueError("Request ids must be unique.")
+
+        failed: set[str] = set()
+        attempt = 0
+        while pending:
+            retry: dict[str, http.HttpRequest] = {}
+
+            def _batch_callback(
+                request_id: str,
+                response: typing.Any,
+                exception: typing.Optional[http.HttpError],
+            ) -> None:
+                # retry operations that were rate limited in a later round of batches
+                if (
+                    exception is not None
+                    and attempt < self._config.num_retries
+                    and self._is_rate_limited(exception)
+                ):
+                    retry[request_id] = pending[request_id]
+                    return
+                if exception is not None:
+                    failed.add(request_id)
+                callback(request_id, response, exception)
+
+            groups = list(self._batched(pending.items(), operations_per_batch))
+            num_workers = min(performance.num_workers, len(groups))
+            if num_workers > 1:
+                with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=num_workers, thread_name_prefix="file-mover-batch"
+                ) as executor:
+                    futures = [
+                        executor.submit(self._send_batch, index, group, _batch_callback)
+                        for index, group in enumerate(groups)
+                    ]
+                    for future in futures:
+                        future.result()
+            else:
+                for index, group in enumerate(groups):
+                    self._send_batch(index, group, _batch_callback)
+
+            if retry:
+                attempt += 1
+                self._pacer.reduce_rate()
+                delay_seconds = self._retry_delay(attempt)
+                logger.warning(
+                    "Retrying %s rate limited operations in %.1f seconds.",
+                    len(retry),
+                    delay_seconds,
+                )
+                time.sleep(delay_seconds)
+
+            pending = retry
 
+        if failed:
+            logger.warning(
+                "%s of %s batch operations failed.", len(failed), len(request_ids)
+            )
+        return failed
+
+    def _send_batch(
+        self,
+        index: int,
+        operations_group: tuple[tuple[str, http.HttpRequest], ...],
+        callback: typing.Callable[
+            [str, typing.Any, typing.Optional[http.HttpError]], None
+        ],
+    ) -> None:
+        """Send one batch request.
+
+        Args:
+            index: The index of the batch.
+            operations_group: The request id and request for each operation.
+            callback: The callback for the result of each operation.
+
+        Returns:
+            None
+        """
+        if len(operations_group) == 1:
+            # A batch of one operation only adds the batch overhead,
+            # so send the operation by itself on the kept-alive connection.
+            ((operation_id, operation_request),) = operations_group
             try:
-                logger.debug(
-                    "Sending batch %s with %s operations.", index + 1, len(batch)
-                )
-                self._do_execute(batch)
-                logger.debug("Sent batch %s.", index + 1)
+                # a rate limited operation is retried by execute_batch
+                response = self._execute_request(operation_request, retry=False)
             except http.HttpError as error:
-                logger.error(
-                    "An error occurred in batch %s: %s", index + 1, error, exc_info=True
-                )
+                callback(operation_id, None, error)
+                return
+            callback(operation_id, response, None)
+            return
+
+        batch = self.client.new_batch_http_request(callback=callback)
+        for operation_id, operation_request in operations_group:
+            batch.add(operation_request, request_id=operation_id)
+
+        try:
+            logger.debug(
+                "Sending batch %s with %s operations.",
+                index + 1,
+                len(operations_group),
+            )
+            # Each operation in a batch counts towards the usage limits.
+            self._execute_request(batch, weight=len(operations_group))
+            logger.debug("Sent batch %s.", index + 1)
+        except http.HttpError as error:
+            logger.error(
+                "An error occurred in batch %s: %s", index + 1, error, exc_info=True
+            )
+            for operation_id, _ in operations_group:
+                callback(operation_id, None, error)
 
     def _do_execute(self, request) -> typing.Mapping:
         """Send a request and obtain the response.
@@ -260,14 +604,180 @@ class GoogleDriveApi:
             The response.
         """
         try:
-            response = request.execute(num_retries=self._config.num_retries)
+            response = self._execute_request(request)
             # self._write_request_response(request, response)
             return response
         except HttpError as e:
-            logger.debug(f"Request failed: {request}", e)
+            logger.debug("Request failed: %s %s", request, e)
 
         return {}
 
+    def _execute_request(
+        self, request, weight: int = 1, retry: bool = True
+    ) -> typing.Any:
+        """Send a request, waiting for the rate limit, and obtain the response.
+
+        A request that is rate limited, fails with a server error,
+        or cannot connect is sent again, up to the configured number of retries.
+
+        Args:
+            request: The request to send.
+            weight: The number of operations in the request.
+            retry: Whether to send the request again when it fails.
+                Batch requests are never sent again,
+                as the operations in a batch are retried by execute_batch.
+
+        Returns:
+            The response.
+
+        Raises:
+            HttpError: The request failed.
+        """
+        # The client library's retries are not used,
+        # so that this is the only place that a request is sent again.
+        params: dict[str, typing.Any] = {}
+
+        # The shared http transport is not thread-safe,
+        # so requests sent from other threads use a transport for that thread.
+        thread_http = self._thread_http()
+        if thread_http is not None:
+            params["http"] = thread_http
+
+        # Batch requests do not support retries.
+        if isinstance(request, http.BatchHttpRequest):
+            retry = False
+        else:
+            params["num_retries"] = 0
+
+        num_retries = self._config.num_retries if retry else 0
+        limiter = self._limiter
+        attempt = 0
+        while True:
+            self._pacer.acquire(weight)
+            if limiter is not None:
+                limiter.acquire()
+
+            rate_limited = False
+            retry_after = None
+            try:
+                return request.execute(**params)
+            except HttpError as e:
+                rate_limited = self._is_rate_limited(e)
+                if rate_limited:
+                    self._pacer.reduce_rate()
+                    retry_after = self._retry_after(e)
+                elif not self._is_server_error(e):
+                    raise
+                if attempt >= num_retries:
+                    raise
+                reason = str(e.resp.status)
+            except (ConnectionError, TimeoutError) as e:
+                if attempt >= num_retries:
+                    raise
+                reason = type(e).__name__
+            finally:
+                if limiter is not None:
+                    limiter.release(rate_limited)
+
+            # The client library sends a request again after the same errors.
+            # A rate limited request was not processed, so it is safe to send again.
+            attempt += 1
+            delay_seconds = retry_after or self._retry_delay(attempt)
+            logger.warning(
+                "Retrying request (%s) in %.1f seconds, attempt %s of %s.",
+                reason,
+                delay_seconds,
+                attempt,
+                num_retries,
+            )
+            time.sleep(delay_seconds)
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Get the time to wait before retrying a rate limited request.
+
+        Args:
+            attempt: The retry attempt, starting at 1.
+
+        Returns:
+            The number of seconds to wait.
+        """
+        # exponential backoff with a random part, so retries are spread out
+        # https://developers.google.com/drive/api/guides/limits#exponential
+        return min(2**attempt + random.random() * 0.5, 60)
+
+    def _retry_after(self, error: HttpError) -> typing.Optional[float]:
+        """Get the time to wait that was given in a rate limited response.
+
+        Args:
+            error: The request error.
+
+        Returns:
+            The number of seconds to wait, or None if no time was given.
+        """
+        value = error.resp.get("retry-after") if error.resp is not None else None
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            # the value can also be a date, which is not used
+            return None
+        return min(max(seconds, 0.0), 60.0)
+
+    def _is_server_error(self, error: HttpError) -> bool:
+        """Check whether a request failed because of a temporary server error.
+
+        Args:
+            error: The request error.
+
+        Returns:
+            True if the request failed with a server error.
+        """
+        status = error.resp.status if error.resp is not None else None
+        return status is not None and status >= 500
+
+    def _is_rate_limited(self, error: HttpError) -> bool:
+        """Check whether a request failed because the usage limits were exceeded.
+
+        Args:
+            error: The request error.
+
+        Returns:
+            True if the request was rate limited.
+        """
+        # https://developers.google.com/drive/api/guides/limits
+        status = error.resp.status if error.resp is not None else None
+        if status == 429:
+            return True
+        if status != 403:
+            return False
+        content = error.content or b""
+        if isinstance(content, bytes):
+            content = content.decode("utf-8", errors="replace")
+        # e.g. rateLimitExceeded, userRateLimitExceeded, sharingRateLimitExceeded
+        return "ratelimitexceeded" in content.casefold()
+
+    def _thread_http(self) -> typing.Any:
+        """Get the http transport for the current thread.
+
+        Returns:
+            The http transport, or None to use the client's transport.
+
+        Raises:
+            ValueError: A transport for the current thread could not be built.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return None
+
+        thread_http = getattr(self._thread_local, "http", None)
+        if thread_http is None:
+            thread_http = self._client.new_http() if self._client else None
+            if thread_http is None:
+                raise ValueError(
+                    "Cannot send requests from more than one thread "
+                    "without credentials to build an http transport for each thread."
+                )
+            self._thread_local.http = thread_http
+        return thread_http
+
     def _write_request_response(self, request, response) -> None:
         file_date_str = datetime.datetime.now().isoformat(
             sep="-", timespec="microseconds"
@@ -289,30 +799,34 @@ class GoogleDriveApi:
             "response": response,
         }
 
+        if orjson is not None:
+            options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            write_path.write_bytes(orjson.dumps(data, option=options))
+            return
+
         with open(write_path, "wt", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
 
     def _batched(
         self,
-        iterable: typing.Iterable[http.HttpRequest],
+        iterable: typing.Iterable[typing.Any],
         count: int = 1,
-        fill_value: typing.Any = None,
-    ) -> typing.Iterable[typing.Iterable[http.HttpRequest]]:
-        """Collect data into fixed-length chunks or blocks.
+    ) -> typing.Iterable[tuple[typing.Any, ...]]:
+        """Collect data into chunks of up to count items.
 
         Args:
             iterable: The iterables to break into batches.
-            count: The number of items per batch.
-            fill_value: The value to fill shorter batches.
+            count: The maximum number of items per batch.
 
         Returns:
             An iterable of batches.
         """
 
-        # e.g. _batched('ABCDEFG', 3, 'x') --> ABC DEF Gxx"
-        # https://docs.python.org/3.5/library/itertools.html#itertools-recipes
-        args = [iter(iterable)] * count
-        return itertools.zip_longest(*args, fillvalue=fill_value)
+        # e.g. _batched('ABCDEFG', 3) --> ABC DEF G
+        # https://docs.python.org/3/library/itertools.html#itertools.batched
+        iterator = iter(iterable)
+        while batch := tuple(itertools.islice(iterator, count)):
+            yield batch
 
     def _request_display(self, request: http.HttpRequest) -> str:
         """Build the display text for a request.
@@ -323,11 +837,10 @@ class GoogleDriveApi:
         Returns:
             The text representing the request.
         """
-        if isinstance(request, http.HttpRequest):
-            return (
-                f"[{request.__class__.__name__}] {request.method}: {request.methodId}"
-            )
-        return f"[{request.__class__.__name__}] {str(request)}"
+        method_id = getattr(request, "methodId", None)
+        if method_id:
+            return f"[{type(request).__name__}] {request.method}: {method_id}"
+        return f"[{type(request).__name__}] {str(request)}"
 
 
 class GoogleDriveContainer:
@@ -350,31 +863,58 @@ class GoogleDriveContainer:
         self._account = account
 
         self._entry_fields = models.GoogleDriveEntry.required_properties()
+        self._files_get_base = self._build_files_get_base()
+        self._files_list_base = self._build_files_list_base()
+        self._permissions_list_base = self._build_permissions_list_base()
 
     @property
     def api(self):
         return self._api
 
     def _files_list_params(self, query: str):
+        return {**self._files_list_base, "q": query}
+
+    def _build_files_get_base(self) -> dict[str, typing.Any]:
+        """Build the files get parameters that are the same for every entry.
+
+        Returns:
+            The files get parameters, without the file id.
+        """
+        params: dict[str, typing.Any] = {
+            # the file id is set for each request
+            "fileId": None,
+            "fields": self._entry_fields,
+        }
+
+        if self._account.account_type == _ACCOUNT_BUSINESS:
+            params["supportsAllDrives"] = True
+
+        return params
+
+    def _build_files_list_base(self) -> dict[str, typing.Any]:
+        """Build the files list parameters that are the same for every query.
+
+        Returns:
+            The files list parameters, without the query.
+        """
         fields = f"nextPageToken,files({self._entry_fields})"
         params = {
             "spaces": "drive",
-            "q": query,
+            # the query is set for each request
+            "q": None,
             "fields": fields,
             "pageSize": 1000,
             "orderBy": "folder,name",
         }
 
         account_type = self._account.account_type
-        account_type_personal = models.GoogleDriveAccountTypeOptions.PERSONAL
-        account_type_business = models.GoogleDriveAccountTypeOptions.BUSINESS
 
-        if account_type == account_type_personal:
+        if account_type == _ACCOUNT_PERSONAL:
             params["corpora"] = "user"
             params["includeItemsFromAllDrives"] = False
             params["supportsAllDrives"] = False
 
-        elif account_type == account_type_business:
+        elif account_type == _ACCOUNT_BUSINESS:
             params["corpora"] = "drive"
             params["driveId"] = self._account.drive_id
             params["includeItemsFromAllDrives"] = True
@@ -385,6 +925,23 @@ class GoogleDriveContainer:
 
         return params
 
+    def _build_permissions_list_base(self) -> dict[str, typing.Any]:
+        """Build the permissions list parameters that are the same for every entry.
+
+        Returns:
+            The permissions list parameters, without the file id.
+        """
+        permission_fields = models.GoogleDrivePermission.required_properties()
+        params = {
+            "fields": f"nextPageToken,permissions({permission_fields})",
+            "useDomainAdminAccess": False,
+        }
+
+        if self._account.account_type == _ACCOUNT_BUSINESS:
+            params["supportsAllDrives"] = True
+
+        return params
+
     def record_copy(
         self,
         original_entry: models.GoogleDriveEntry,
@@ -393,11 +950,10 @@ class GoogleDriveContainer:
         """Add a property to the original entry to record the id of the new entry."""
 
         entry_id = original_entry.entry_id
-        key = models.GoogleDrivePropertyKeyOptions.CUSTOM_COPY_FILE_ID.value
         body = {
             "properties": {
                 **original_entry.properties_shared,
-                key: new_entry.entry_id,
+                _PROPERTY_KEY_COPY_FILE_ID: new_entry.entry_id,
             }
         }
         fields = self._entry_fields
@@ -431,10 +987,8 @@ class GoogleDriveContainer:
             "modifiedTime": entry.date_modified.isoformat(timespec="microseconds"),
             "name": entry.name + self._new_stem_end,
             "parents": [new_parent_id],
-            "mimeType": models.GoogleDriveEntry.mime_type_dir(),
-            "properties": {
-                models.GoogleDrivePropertyKeyOptions.CUSTOM_ORIGINAL_FILE_ID.value: entry.entry_id
-            },
+            "mimeType": _MIME_TYPE_DIR,
+            "properties": {_PROPERTY_KEY_ORIGINAL_FILE_ID: entry.entry_id},
         }
         fields = self._entry_fields
 
@@ -444,16 +998,7 @@ class GoogleDriveContainer:
     def get_entry(self, entry_id: str) -> http.HttpRequest:
         """Get an entry by id."""
 
-        params: dict[str, typing.Any] = {
-            "fileId": entry_id,
-            "fields": self._entry_fields,
-        }
-
-        account_type = self._account.account_type
-        account_type_business = models.GoogleDriveAccountTypeOptions.BUSINESS
-
-        if account_type == account_type_business:
-            params["supportsAllDrives"] = True
+        params = {**self._files_get_base, "fileId": entry_id}
 
         operation = self._api.files_get(**params)
         return operation
@@ -464,10 +1009,15 @@ class GoogleDriveContainer:
         matching the given key and value.
         """
 
+        key = key.translate(_QUERY_ESCAPE)
+        value = value.translate(_QUERY_ESCAPE)
         kv_str = f"key='{key}' and value='{value}'"
-        query = f"properties has {{ {kv_str} }} and trashed=false"
+        query = f"properties has {{ {kv_str} }} and {_QUERY_NOT_TRASHED}"
         params = self._files_list_params(query)
 
+        # only need to know if there are no matches, one match, or more than one
+        params["pageSize"] = 2
+
         operation = self._api.files_list(**params)
         return operation
 
@@ -479,7 +1029,21 @@ class GoogleDriveContainer:
         # query_folder_type = "mimeType='application/vnd.google-apps.folder'"
         # query_folder_id = f"id = '{top_folder_id}'"
 
-        query = f"'{folder_id}' in parents and trashed=false"
+        folder_id = folder_id.translate(_QUERY_ESCAPE)
+        query = f"'{folder_id}' in parents and {_QUERY_NOT_TRASHED}"
+        params = self._files_list_params(query)
+
+        operation = self._api.files_list(**params)
+        return operation
+
+    def get_children_multi(self, folder_ids: typing.Sequence[str]) -> http.HttpRequest:
+        """Get the child entries of the folders with the given ids."""
+
+        query_parents = " or ".join(
+            f"'{folder_id.translate(_QUERY_ESCAPE)}' in parents"
+            for folder_id in folder_ids
+        )
+        query = f"({query_parents}) and {_QUERY_NOT_TRASHED}"
         params = self._files_list_params(query)
 
         operation = self._api.files_list(**params)
@@ -492,34 +1056,6 @@ class GoogleDriveContainer:
         )
         return operation
 
-    def delete_permissions(
-        self, entry: models.GoogleDriveEntry
-    ) -> list[http.HttpRequest]:
-        """Delete permissions for entry that are not the owner or current user."""
-
-        permission_user = models.GoogleDrivePermissionTypeOptions.USER
-        permission_anyone = models.GoogleDrivePermissionTypeOptions.ANYONE
-        role_owner = models.GoogleDrivePermissionRoleOptions.OWNER.value
-
-        operations = []
-        for permission in entry.permissions_all:
-            is_owner = permission.role == role_owner
-            is_anyone = permission.entry_type == permission_anyone
-            is_user = permission.entry_type == permission_user
-            is_current_user = permission.user_email == self._account.account_id
-
-            if is_owner or (is_user and is_current_user):
-                logger.debug('Keep permission: "%s".', str(permission))
-
-            elif is_anyone or (is_user and not is_current_user):
-                operation = self.delete_permission(entry.entry_id, permission.entry_id)
-                operations.append(operation)
-
-            else:
-                raise ValueError(f'Don\'t know about permission "{str(permission)}".')
-
-        return operations
-
     def rename_entry(
         self, entry: models.GoogleDriveEntry, new_name: str
     ) -> http.HttpRequest:
@@ -555,9 +1091,7 @@ class GoogleDriveContainer:
             "description": entry.description,
             "name": new_name,
             "parents": [parent_id],
-            "properties": {
-                models.GoogleDrivePropertyKeyOptions.CUSTOM_ORIGINAL_FILE_ID.value: entry.entry_id
-            },
+            "properties": {_PROPERTY_KEY_ORIGINAL_FILE_ID: entry.entry_id},
             "mimeType": entry.mime_type,
         }
         fields = self._entry_fields
@@ -584,26 +1118,7 @@ class GoogleDriveContainer:
     def get_permissions(self, entry_id: str) -> http.HttpRequest:
         """Get the permissions for a file or folder or shared drive."""
 
-        permission_props = [
-            "id",
-            "type",
-            "emailAddress",
-            "domain",
-            "role",
-            "displayName",
-            "permissionDetails",
-        ]
-
-        params = {
-            "fileId": entry_id,
-            "fields": f"nextPageToken,permissions({','.join(permission_props)})",
-            "useDomainAdminAccess": False,
-        }
-
-        account_type_business = models.GoogleDriveAccountTypeOptions.BUSINESS
-        if self._account.account_type == account_type_business:
-            params["supportsAllDrives"] = True
-
+        params = {"fileId": entry_id, **self._permissions_list_base}
         operation = self._api.permissions_list(**params)
         return operation
 
@@ -614,8 +1129,39 @@ class GoogleDriveActions:
     by executing requests that have been built.
     """
 
-    def __init__(self, container: GoogleDriveContainer):
+    _permissions_cache_max = 50000
+    """The maximum number of entries to keep permissions for."""
+    _permissions_cache_seconds = 600.0
+    """The number of seconds to keep the permissions for an entry.
+    A change to the role of an existing permission is not visible
+    in the entry data, so stored permissions are only used for a limited time."""
+    _entry_cache_max = 8192
+    """The maximum number of entries to keep."""
+    _folders_query_max = 7000
+    """The maximum length of the query used to get the contents of many folders."""
+
+    def __init__(
+        self,
+        container: GoogleDriveContainer,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ):
         self._container = container
+        self._clock = clock
+        self._api = container.api
+        self._performance = self._api.config.performance
+        self._account = self._api.config.account
+
+        # The permissions by entry id, with the modified time and permission ids
+        # of the entry and the clock time when the permissions were retrieved.
+        self._permissions_cache: collections.OrderedDict[
+            str,
+            tuple[_PermissionsKey, float, tuple[models.GoogleDrivePermission, ...]],
+        ] = collections.OrderedDict()
+        # The most recently retrieved entries by entry id.
+        self._entry_cache: collections.OrderedDict[
+            str, models.GoogleDriveEntry
+        ] = collections.OrderedDict()
+        self._cache_lock = threading.Lock()
 
     @property
     def container(self) -> GoogleDriveContainer:
@@ -627,28 +1173,316 @@ class GoogleDriveActions:
         """
         Get all descendants of the given folder.
         In other words, get the files in the folder,
-        then the files in each sub-folder, recursively.
+        then the files in each sub-folder, depth-first.
+        """
+
+        entries_buffer = self._performance.entries_buffer
+        if entries_buffer > 0:
+            yield from utils.iter_buffered(
+                self._iter_descendants(folder_id), entries_buffer
+            )
+        else:
+            yield from self._iter_descendants(folder_id)
+
+    def _iter_descendants(
+        self, folder_id: str
+    ) -> typing.Generator[models.GoogleDriveEntry, typing.Any, None]:
+        """Get all descendants of the given folder, depth-first.
+
+        Args:
+            folder_id: The id of the top folder.
+
+        Returns:
+            A generator of the entries.
+        """
+        performance = self._performance
+
+        if performance.num_workers > 1:
+            yield from self._get_descendants_concurrent(
+                folder_id, performance.num_workers
+            )
+            return
+
+        if performance.folders_per_request > 1:
+            yield from self._get_descendants_grouped(folder_id)
+            return
+
+        # Use a stack of the folders being processed, instead of recursion.
+        # The children of a folder are only requested when they are needed,
+        # after the folder itself has been provided.
+        stack = [(folder_id, self._iter_children_entries(folder_id))]
+        while stack:
+            parent_id, children = stack[-1]
+            entry = next(children, None)
+            if entry is None:
+                stack.pop()
+                continue
+
+            # provide the children of parent_id
+            yield entry
+
+            if entry.entry_id != parent_id and entry.is_dir:
+                # then provide the children of folders in parent_id
+                stack.append(
+                    (entry.entry_id, self._iter_children_entries(entry.entry_id))
+                )
+
+    def _get_descendants_grouped(
+        self, folder_id: str
+    ) -> typing.Generator[models.GoogleDriveEntry, typing.Any, None]:
+        """Get all descendants of the given folder,
+        getting the contents of sibling folders using one list request.
+
+        The entries are provided in the same order as the one folder per request
+        traversal.
+
+        Args:
+            folder_id: The id of the top folder.
+
+        Returns:
+            A generator of the entries.
         """
+        # The children of folders that have been retrieved, but not yet provided.
+        retrieved: dict[str, list[models.GoogleDriveEntry]] = {}
+        # The folders that have been found, but not yet retrieved.
+        pending: dict[str, None] = {}
+
+        def _children(parent_id: str) -> typing.Iterator[models.GoogleDriveEntry]:
+            if parent_id not in retrieved:
+                pending.pop(parent_id, None)
+                group = next(self._group_folder_ids([parent_id, *pending]))
+                for item in group:
+                    pending.pop(item, None)
+                retrieved.update(self._get_children_entries_multi(group))
+
+            entries = retrieved.pop(parent_id)
+            for entry in entries:
+                if entry.entry_id != parent_id and entry.is_dir:
+                    pending[entry.entry_id] = None
+            return iter(entries)
+
+        stack = [(folder_id, _children(folder_id))]
+        while stack:
+            parent_id, children = stack[-1]
+            entry = next(children, None)
+            if entry is None:
+                stack.pop()
+                continue
+
+            yield entry
+
+            if entry.entry_id != parent_id and entry.is_dir:
+                stack.append((entry.entry_id, _children(entry.entry_id)))
+
+    def _get_descendants_concurrent(
+        self, folder_id: str, num_workers: int
+    ) -> typing.Generator[models.GoogleDriveEntry, typing.Any, None]:
+        """Get all descendants of the given folder,
+        getting the contents of sub-folders using a pool of threads.
+
+        The entries are provided in the same order as the single-threaded traversal.
+
+        Args:
+            folder_id: The id of the top folder.
+            num_workers: The number of threads.
 
+        Returns:
+            A generator of the entries.
+        """
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=num_workers, thread_name_prefix="file-mover"
+        )
+        try:
+            future = executor.submit(self._get_children_entries_multi, [folder_id])
+            stack = [self._submit_sub_folders(executor, folder_id, future)]
+            while stack:
+                children, sub_folders = stack[-1]
+                entry = next(children, None)
+                if entry is None:
+                    stack.pop()
+                    continue
+
+                yield entry
+
+                sub_folder = sub_folders.get(entry.entry_id)
+                if sub_folder is not None:
+                    stack.append(
+                        self._submit_sub_folders(executor, entry.entry_id, sub_folder)
+                    )
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _submit_sub_folders(
+        self,
+        executor: concurrent.futures.Executor,
+        folder_id: str,
+        future: concurrent.futures.Future,
+    ) -> tuple[
+        typing.Iterator[models.GoogleDriveEntry],
+        dict[str, concurrent.futures.Future],
+    ]:
+        """Wait for the children of a folder,
+        then start getting the contents of each sub-folder.
+
+        Args:
+            executor: The executor used to get the contents of sub-folders.
+            folder_id: The id of the folder.
+            future: The future that provides the children of the folder.
+
+        Returns:
+            An iterator of the children, and the futures for the sub-folders.
+        """
+        entries = future.result()[folder_id]
+
+        sub_folder_ids = [
+            entry.entry_id
+            for entry in entries
+            if entry.entry_id != folder_id and entry.is_dir
+        ]
+
+        sub_folders = {}
+        for group in self._group_folder_ids(sub_folder_ids):
+            group_future = executor.submit(self._get_children_entries_multi, group)
+            sub_folders.update((item, group_future) for item in group)
+
+        return iter(entries), sub_folders
+
+    def _iter_children_entries(
+        self, folder_id: str
+    ) -> typing.Generator[models.GoogleDriveEntry, typing.Any, None]:
+        """Provide the entries that are direct children of a folder,
+        as they are retrieved.
+
+        Args:
+            folder_id: The id of the folder.
+
+        Returns:
+            A generator of the child entries.
+        """
         container = self._container
-        api = container.api
+        api = self._api
+
+        if self._performance.batch_permissions:
+            yield from self._get_children_entries(folder_id)
+            return
 
         request = container.get_children(folder_id)
         for entry_data in api.execute_files_list(request):
-            # provide the children of folder_id
-            entry = self._get_entry(entry_data)
-            yield entry
+            yield self._get_entry(entry_data)
+
+    def _get_children_entries(self, folder_id: str) -> list[models.GoogleDriveEntry]:
+        """Get the entries that are direct children of a folder.
 
-            if entry.entry_id != folder_id and entry.is_dir:
-                # provide the children of folders in folder_id
-                for entry_desc in self.get_descendants(entry.entry_id):
-                    yield entry_desc
+        Args:
+            folder_id: The id of the folder.
+
+        Returns:
+            The child entries.
+        """
+        container = self._container
+        api = self._api
+
+        request = container.get_children(folder_id)
+        entries_data = list(api.execute_files_list(request))
+        return self._build_entries(entries_data)
+
+    def _get_children_entries_multi(
+        self, folder_ids: typing.Sequence[str]
+    ) -> dict[str, list[models.GoogleDriveEntry]]:
+        """Get the entries that are direct children of each of the folders.
+
+        Args:
+            folder_ids: The ids of the folders.
+
+        Returns:
+            The child entries by folder id.
+        """
+        if len(folder_ids) == 1:
+            return {folder_ids[0]: self._get_children_entries(folder_ids[0])}
+
+        container = self._container
+        api = self._api
+
+        if self._performance.batch_folder_lists:
+            requests = {
+                folder_id: container.get_children(folder_id) for folder_id in folder_ids
+            }
+            items, errors = api.execute_files_list_batch(requests)
+            if errors:
+                folder_id, error = next(iter(errors.items()))
+                raise ValueError(
+                    f"Could not get the contents of folder id '{folder_id}'."
+                ) from error
+            entries_data = [
+                entry_data
+                for folder_id in folder_ids
+                for entry_data in items[folder_id]
+            ]
+        else:
+            request = container.get_children_multi(folder_ids)
+            entries_data = list(api.execute_files_list(request))
+
+        entries = self._build_entries(entries_data)
+
+        # the entries are in the requested order within each folder
+        result: dict[str, list[models.GoogleDriveEntry]] = {
+            folder_id: [] for folder_id in folder_ids
+        }
+        for entry in entries:
+            children = result.get(entry.parent_id)
+            if children is None:
+                logger.warning(
+                    "Ignoring entry '%s' in folder id '%s' that was not requested.",
+                    entry.entry_id,
+                    entry.parent_id,
+                )
+                continue
+            children.append(entry)
+        return result
+
+    def _group_folder_ids(
+        self, folder_ids: typing.Iterable[str]
+    ) -> typing.Generator[list[str], typing.Any, None]:
+        """Split folder ids into groups that can be listed using one request.
+
+        Args:
+            folder_ids: The folder ids.
+
+        Returns:
+            A generator of the groups of folder ids.
+        """
+        size = self._performance.folders_per_request
+        group: list[str] = []
+        length = 0
+        for folder_id in folder_ids:
+            # allow for the quotes and the ' in parents or ' text
+            item_length = len(folder_id) + 18
+            if group and (
+                len(group) >= size or length + item_length > self._folders_query_max
+            ):
+                yield group
+                group = []
+                length = 0
+            group.append(folder_id)
+            length += item_length
+        if group:
+            yield group
 
     def get_entry(self, entry_id: str) -> models.GoogleDriveEntry:
-        """Get the details of a file or folder."""
+        """Get the details of a file or folder.
+
+        The details retrieved earlier are used,
+        unless the entry has been changed since then.
+        """
+
+        container = self._container
+        api = self._api
 
-        container = self.container
-        api = container.api
+        with self._cache_lock:
+            cached = self._entry_cache.get(entry_id)
+            if cached is not None:
+                self._entry_cache.move_to_end(entry_id)
+                return cached
 
         request = container.get_entry(entry_id)
         entry_data = api.execute_single(request)
@@ -667,38 +1501,33 @@ class GoogleDriveActions:
         """
 
         container = self._container
-        api = container.api
-        config = api.config
-        account = config.account
+        api = self._api
+        account = self._account
 
-        account_type_personal = models.GoogleDriveAccountTypeOptions.PERSONAL
-        if account.account_type != account_type_personal:
+        if account.account_type != _ACCOUNT_PERSONAL:
             raise ValueError(
-                f"Entry pairs only work in '{account_type_personal}' accounts, "
+                f"Entry pairs only work in '{_ACCOUNT_PERSONAL}' accounts, "
                 f"not '{account.account_type}'."
             )
 
         account_id = account.account_id
         entry_is_owned = entry.is_owned_by(account_id)
 
-        key_copy = models.GoogleDrivePropertyKeyOptions.CUSTOM_COPY_FILE_ID.value
-        key_orig = models.GoogleDrivePropertyKeyOptions.CUSTOM_ORIGINAL_FILE_ID.value
-
         if entry_is_owned:
             # if the entry is owned (might be a copy),
             # see if there is an original that is not owned
-            prop_key = key_copy
+            prop_key = _PROPERTY_KEY_COPY_FILE_ID
 
             # check the found original (unowned) entry's property
-            pair_key = key_orig
+            pair_key = _PROPERTY_KEY_ORIGINAL_FILE_ID
 
         else:
             # if the entry is not owned (the original),
             # see if there is a copy that is owned
-            prop_key = key_orig
+            prop_key = _PROPERTY_KEY_ORIGINAL_FILE_ID
 
             # check the found copy (owned) entry's property
-            pair_key = key_copy
+            pair_key = _PROPERTY_KEY_COPY_FILE_ID
 
         if not prop_key:
             return None
@@ -707,12 +1536,10 @@ class GoogleDriveActions:
         prop_value = entry.entry_id
         request = container.get_entries_by_property(prop_key, prop_value)
 
-        entries = []
-        for entry_data in api.execute_files_list(request):
-            entry_item = self._get_entry(entry_data)
-            entries.append(entry_item)
+        # check for more than one match before getting the permissions
+        entries_data = list(itertools.islice(api.execute_files_list(request), 2))
 
-        entry_count = len(entries)
+        entry_count = len(entries_data)
         if entry_count > 1:
             raise ValueError(
                 f"More than one match for property '{prop_key}={prop_value}'."
@@ -722,7 +1549,7 @@ class GoogleDriveActions:
             return None
 
         # found the pair
-        pair_entry = entries[0]
+        pair_entry = self._get_entry(entries_data[0])
 
         # check that the pair has the expected id stored in the entry
         expected_pair_id = entry.properties_shared.get(pair_key)
@@ -753,12 +1580,12 @@ class GoogleDriveActions:
         """
         container = self._container
         request_new = container.create_folder(entry, entry.parent_id)
-        response_new = container.api.execute_single(request_new)
+        response_new = self._execute_change(request_new, entry.parent_id)
         new_entry = self._get_entry(response_new)
 
         # update the entry to add the property
         request_exist = container.record_copy(entry, new_entry)
-        response_exist = container.api.execute_single(request_exist)
+        response_exist = self._execute_change(request_exist, entry.entry_id)
         entry = self._get_entry(response_exist)
 
         return new_entry, entry
@@ -778,12 +1605,12 @@ class GoogleDriveActions:
         """
         container = self._container
         request_new = container.copy_file(entry, entry.parent_id)
-        response_new = container.api.execute_single(request_new)
+        response_new = self._execute_change(request_new, entry.parent_id)
         new_entry = self._get_entry(response_new)
 
         # update the entry to add the property
         request_exist = container.record_copy(entry, new_entry)
-        response_exist = container.api.execute_single(request_exist)
+        response_exist = self._execute_change(request_exist, entry.entry_id)
         entry = self._get_entry(response_exist)
 
         return new_entry, entry
@@ -802,7 +1629,7 @@ class GoogleDriveActions:
         """
         container = self._container
         request = container.rename_entry(entry, name)
-        response = container.api.execute_single(request)
+        response = self._execute_change(request, entry.entry_id)
         entry = self._get_entry(response)
         return entry
 
@@ -818,7 +1645,9 @@ class GoogleDriveActions:
         """
         container = self._container
         request = container.delete_permission(entry_id, permission_id)
-        container.api.execute_single(request)
+
+        # the permission might have been inherited by descendants
+        self._execute_change(request, None)
 
     def move_entry(self, entry: models.GoogleDriveEntry, new_parent_id: str):
         """Move a file from one folder to another folder.
@@ -832,7 +1661,13 @@ class GoogleDriveActions:
         """
         container = self._container
         request = container.move_entry(entry, new_parent_id)
-        response = container.api.execute_single(request)
+
+        # The entry and its descendants might have different inherited permissions.
+        # The stored entries do not record which entries are descendants,
+        # so a move forgets all stored entries and permissions,
+        # not only those for the moved entry and its descendants.
+        response = self._execute_change(request, None)
+
         entry = self._get_entry(response)
         return entry
 
@@ -841,15 +1676,131 @@ class GoogleDriveActions:
     ):
         container = self._container
         request = container.update_properties(entry, all_props)
-        response = container.api.execute_single(request)
+        response = self._execute_change(request, entry.entry_id)
         entry = self._get_entry(response)
         return entry
 
-    def _get_entry(self, entry_data: typing.Mapping):
+    def _execute_change(
+        self, request: http.HttpRequest, entry_id: typing.Optional[str]
+    ) -> typing.Mapping:
+        """Send a request that changes the drive,
+        then remove the stored details that might no longer be correct.
+
+        Args:
+            request: The request to send.
+            entry_id: The id of the entry that is changed,
+                or None if the change can affect any entry.
+
+        Returns:
+            The response.
+        """
+        try:
+            return self._api.execute_single(request)
+        finally:
+            # forget the stored details even if the change might have failed
+            if entry_id is None:
+                self._forget_all()
+            else:
+                self._forget_entry(entry_id)
+
+    def _build_entries(
+        self, entries_data: list[typing.Mapping]
+    ) -> list[models.GoogleDriveEntry]:
+        """Build the entries from the raw entry data, including the permissions.
+
+        The permissions are retrieved using batch requests
+        when the batch permissions performance setting is on.
+
+        Args:
+            entries_data: The raw entry data.
+
+        Returns:
+            The entries in the same order as the raw entry data.
+        """
+        if self._performance.batch_permissions:
+            return self._get_entries(entries_data)
+        return [self._get_entry(entry_data) for entry_data in entries_data]
+
+    def _get_entries(
+        self, entries_data: list[typing.Mapping]
+    ) -> list[models.GoogleDriveEntry]:
+        """Build many entries, getting the permissions using batch requests.
+
+        Args:
+            entries_data: The raw data for the entries.
+
+        Returns:
+            The entries, in the same order as the raw data.
+        """
+        entry_ids = [entry_data.get("id") for entry_data in entries_data]
+
+        # only get the permissions that are not already available
+        permissions = {}
+        for entry_id, entry_data in zip(entry_ids, entries_data):
+            if not entry_id:
+                continue
+            available = self._included_permissions(entry_data)
+            if available is None:
+                available = self._cached_permissions(entry_id, entry_data)
+            if available is not None:
+                permissions[entry_id] = available
+
+        missing_ids = [i for i in entry_ids if i and i not in permissions]
+        permissions.update(self._get_permissions_batch(missing_ids))
+
+        return [
+            self._get_entry(entry_data, permissions.get(entry_id))
+            for entry_id, entry_data in zip(entry_ids, entries_data)
+        ]
+
+    def _get_permissions_batch(
+        self, entry_ids: list[str]
+    ) -> dict[str, tuple[models.GoogleDrivePermission, ...]]:
+        """Get the full permissions list for many entries using batch requests.
+
+        Args:
+            entry_ids: The entry ids.
+
+        Returns:
+            The permissions by entry id.
+            Entries that could not be retrieved are not included.
+        """
+        container = self._container
+        api = self._api
+
+        requests = {
+            entry_id: container.get_permissions(entry_id)
+            for entry_id in dict.fromkeys(entry_ids)
+        }
+        if not requests:
+            return {}
+
+        logger.debug(
+            "Getting permissions for %s entries using batch requests.",
+            len(requests),
+        )
+        items, errors = api.execute_permissions_list_batch(requests)
+
+        for entry_id, error in errors.items():
+            logger.warning(
+                "Could not get permissions for entry id '%s': %s", entry_id, error
+            )
+
+        return {
+            entry_id: models.GoogleDrivePermission.load_data_list(permissions_data)
+            for entry_id, permissions_data in items.items()
+        }
+
+    def _get_entry(
+        self,
+        entry_data: typing.Mapping,
+        permissions_list: typing.Optional[
+            tuple[models.GoogleDrivePermission, ...]
+        ] = None,
+    ):
         container = self._container
-        api = container.api
-        config = api.config
-        account = config.account
+        api = self._api
+        account = self._account
 
         entry_id = entry_data.get("id")
         if not entry_id:
@@ -860,12 +1811,16 @@ class GoogleDriveActions:
             raise ValueError("Cannot work with an entry that is trashed.")
 
         # get the full permissions list for the entry
-        request = container.get_permissions(entry_id)
-        permissions_list = []
-        for permission_data in api.execute_permissions_list(request):
-            permissions_list.append(
-                models.GoogleDrivePermission.load_data(permission_data)
+        if permissions_list is None:
+            permissions_list = self._included_permissions(entry_data)
+        if permissions_list is None:
+            permissions_list = self._cached_permissions(entry_id, entry_data)
+        if permissions_list is None:
+            request = container.get_permissions(entry_id)
+            permissions_list = models.GoogleDrivePermission.load_data_list(
+                api.execute_permissions_list(request)
             )
+        self._cache_permissions(entry_id, entry_data, permissions_list)
 
         # create the entry object
         params = {
@@ -874,4 +1829,141 @@ class GoogleDriveActions:
             "fileMoverExtraPermissions": permissions_list,
         }
         entry = models.GoogleDriveEntry.load_data(params)
+
+        with self._cache_lock:
+            self._entry_cache[entry_id] = entry
+            self._entry_cache.move_to_end(entry_id)
+            while len(self._entry_cache) > self._entry_cache_max:
+                self._entry_cache.popitem(last=False)
+
         return entry
+
+    def _included_permissions(
+        self, entry_data: typing.Mapping
+    ) -> typing.Optional[tuple[models.GoogleDrivePermission, ...]]:
+        """Get the permissions included in the entry data,
+        if they are the complete list of permissions for the entry.
+
+        The permissions are not included for items in shared drives,
+        and might not be complete, so they are only used
+        when they match the entry's permission ids.
+
+        Args:
+            entry_data: The raw data for the entry.
+
+        Returns:
+            The permissions, or None if the full list needs to be requested.
+        """
+        included = entry_data.get("permissions")
+        permission_ids = entry_data.get("permissionIds")
+        if included is None or permission_ids is None:
+            return None
+
+        included_ids = [permission_data.get("id") for permission_data in included]
+        if sorted(included_ids) != sorted(permission_ids):
+            return None
+
+        return models.GoogleDrivePermission.load_data_list(included)
+
+    def _permissions_key(self, entry_data: typing.Mapping) -> _PermissionsKey:
+        """Build the key that identifies the permissions of an entry.
+
+        Sharing changes do not update the entry's modified time,
+        but adding or removing a permission changes the entry's permission ids.
+
+        Changing the role of an existing permission changes neither,
+        and the entry data does not include the roles.
+        So the key cannot detect a role-only change,
+        and the stored permissions are also limited by age
+        (see _permissions_cache_seconds).
+
+        Args:
+            entry_data: The raw data for the entry.
+
+        Returns:
+            The modified time and permission ids,
+            or None if the entry data does not include the permission ids.
+        """
+        permission_ids = entry_data.get("permissionIds")
+        if permission_ids is None:
+            return None
+        return entry_data.get("modifiedTime"), tuple(sorted(permission_ids))
+
+    def _cached_permissions(
+        self, entry_id: str, entry_data: typing.Mapping
+    ) -> typing.Optional[tuple[models.GoogleDrivePermission, ...]]:
+        """Get the permissions retrieved earlier for an unchanged entry.
+
+        Args:
+            entry_id: The entry id.
+            entry_data: The raw data for the entry.
+
+        Returns:
+            The permissions, or None if they are not available.
+        """
+        key = self._permissions_key(entry_data)
+        if key is None:
+            return None
+        now = self._clock()
+        with self._cache_lock:
+            cached = self._permissions_cache.get(entry_id)
+            if cached is None:
+                return None
+            cached_key, cached_time, permissions_list = cached
+            if cached_key != key or now - cached_time > self._permissions_cache_seconds:
+                del self._permissions_cache[entry_id]
+                return None
+            self._permissions_cache.move_to_end(entry_id)
+            return permissions_list
+
+    def _cache_permissions(
+        self,
+        entry_id: str,
+        entry_data: typing.Mapping,
+        permissions_list: tuple[models.GoogleDrivePermission, ...],
+    ) -> None:
+        """Store the permissions for an entry.
+
+        Args:
+            entry_id: The entry id.
+            entry_data: The raw data for the entry.
+            permissions_list: The entry's permissions.
+
+        Returns:
+            None
+        """
+        key = self._permissions_key(entry_data)
+        if key is None:
+            return
+        now = self._clock()
+        with self._cache_lock:
+            self._permissions_cache[entry_id] = (key, now, permissions_list)
+            self._permissions_cache.move_to_end(entry_id)
+            while len(self._permissions_cache) > self._permissions_cache_max:
+                self._permissions_cache.popitem(last=False)
+
+    def _forget_entry(self, entry_id: str) -> None:
+        """Remove the stored entry and permissions for an entry that has been changed.
+
+        Args:
+            entry_id: The entry id.
+
+        Returns:
+            None
+        """
+        with self._cache_lock:
+            self._permissions_cache.pop(entry_id, None)
+            self._entry_cache.pop(entry_id, None)
+
+    def _forget_all(self) -> None:
+        """Remove all stored entries and permissions.
+
+        Used for changes such as moves and permission deletes,
+        which can affect the inherited permissions of any descendant entry.
+
+        Returns:
+            None
+        """
+        with self._cache_lock:
+            self._permissions_cache.clear()
+            self._entry_cache.clear()
@@ -1,5 +1,4 @@
 """Common functionality for commands."""
-import abc
 import logging
 import typing
 
@@ -15,7 +14,7 @@ from file_mover_for_google_drive.common import (
 logger = logging.getLogger(__name__)
 
 
-class BaseManage(abc.ABC):
+class BaseManage:
     """A common base for command classes."""
 
     _log_batch_size = 10
@@ -62,6 +61,15 @@ class BaseManage(abc.ABC):
         """
         raise NotImplementedError()
 
+    def close(self) -> None:
+        """Stop any background requests and restore the signal handlers.
+
+        Returns:
+            None
+        """
+        self._api.close()
+        self._graceful_exit.close()
+
     def _iteration_check(self, index: int) -> bool:
         """Check an iteration.
 
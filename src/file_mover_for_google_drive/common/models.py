@@ -1,15 +1,30 @@
 """The data models."""
-import abc
 import dataclasses
 import enum
+import functools
 import json
 import logging
+import math
 import pathlib
+import sys
+import types
 import typing
 from datetime import datetime
 
+try:
+    # optional faster json parsing for the config file
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+_TRUE_VALUES = frozenset([True, "true", "True", "TRUE"])
+_FALSE_VALUES = frozenset([False, "false", "False", "FALSE"])
+_MIME_TYPE_DIR = "application/vnd.google-apps.folder"
+_EMPTY_PROPERTIES: typing.Mapping = types.MappingProxyType({})
+"""The read-only properties shared by all entries that have no properties."""
+
 
 class GoogleDrivePropertyKeyOptions(enum.Enum):
     CUSTOM_COPY_FILE_ID = "CustomFileMoverCopyFileId"
@@ -33,6 +48,12 @@ class GoogleDrivePropertyKeyOptions(enum.Enum):
     """
 
 
+_PROPERTY_KEY_COPY_FILE_ID = GoogleDrivePropertyKeyOptions.CUSTOM_COPY_FILE_ID.value
+_PROPERTY_KEY_ORIGINAL_FILE_ID = (
+    GoogleDrivePropertyKeyOptions.CUSTOM_ORIGINAL_FILE_ID.value
+)
+
+
 class GoogleDriveAccountTypeOptions(enum.Enum):
     """The Google Drive account type. Dictates the features available."""
 
@@ -57,6 +78,10 @@ class GoogleDrivePermissionRoleOptions(enum.Enum):
     FILE_ORGANIZER = "fileOrganizer"
 
 
+_PERMISSION_ROLE_BY_VALUE = {i.value: i for i in GoogleDrivePermissionRoleOptions}
+"""The permission roles by API value, to avoid the enum lookup for each permission."""
+
+
 class GoogleDrivePermissionTypeOptions(enum.Enum):
     """Google Drive permission type options."""
 
@@ -69,6 +94,14 @@ class GoogleDrivePermissionTypeOptions(enum.Enum):
     ANYONE = "anyone"
 
 
+_PERMISSION_TYPE_BY_VALUE = {i.value: i for i in GoogleDrivePermissionTypeOptions}
+"""The permission types by API value, to avoid the enum lookup for each permission."""
+_PERMISSION_TYPES_EMAIL = frozenset(
+    [GoogleDrivePermissionTypeOptions.USER, GoogleDrivePermissionTypeOptions.GROUP]
+)
+"""The permission types that require an email address."""
+
+
 class PlanReportActions(enum.Enum):
     """Plan report item action options."""
 
@@ -88,9 +121,9 @@ class PlanReportOutcomes(enum.Enum):
     FAILED = "failed"
 
 
-@dataclasses.dataclass(frozen=True)
-class BaseModel(abc.ABC):
-    """Base model abstract class."""
+@dataclasses.dataclass(frozen=True, slots=True)
+class BaseModel:
+    """Base class for models."""
 
     @classmethod
     def load_data(cls, data: typing.Mapping) -> "BaseModel":
@@ -112,11 +145,74 @@ class BaseModel(abc.ABC):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def intern(cls, value: typing.Optional[str]) -> typing.Optional[str]:
+        """Use one shared copy of text that is repeated across many instances.
+
+        Args:
+            value: The text.
+
+        Returns:
+            The shared text, or the value if it is not text.
+        """
+        if isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    @classmethod
+    def load_bool(cls, value: typing.Any) -> typing.Any:
+        """Convert a boolean value or the text for a boolean value to a bool.
+
+        Args:
+            value: The raw value.
+
+        Returns:
+            True or False, or the raw value if it is not a boolean value.
+        """
+        if isinstance(value, (bool, str)):
+            if value in _TRUE_VALUES:
+                return True
+            if value in _FALSE_VALUES:
+                return False
+        return value
+
+    @classmethod
+    def load_number(cls, name: str, value: typing.Any, number_type: type) -> float:
+        """Convert a number or the text for a number to an int or float.
+
+        Args:
+            name: The name of the setting, used in the error message.
+            value: The raw value.
+            number_type: The type of number, either int or float.
+
+        Returns:
+            The number.
+
+        Raises:
+            ValueError: If the value is not a number,
+                or is not a whole number when an int is required.
+        """
+        kind = "whole number" if number_type is int else "number"
+        message = f"The {name} must be a {kind}, not '{value}'."
+        if isinstance(value, bool):
+            raise ValueError(message)
+        try:
+            number = float(value)
+        except (TypeError, ValueError) as error:
+            raise ValueError(message) from error
+        if not math.isfinite(number):
+            raise ValueError(message)
+        if number_type is int:
+            if not number.is_integer():
+                raise ValueError(message)
+            return int(number)
+        return number
+
 
 TypeBaseModel_co = typing.TypeVar("TypeBaseModel_co", bound="BaseModel", covariant=True)
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class ConfigAuth(BaseModel):
     """The authentication configuration."""
 
@@ -154,7 +250,7 @@ class ConfigAuth(BaseModel):
         }
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class ConfigReports(BaseModel):
     """The report files configuration."""
 
@@ -169,16 +265,15 @@ class ConfigReports(BaseModel):
 
     @classmethod
     def load_data(cls, data: typing.Mapping) -> "ConfigReports":
-        items = ["entries_dir", "permissions_dir", "plans_dir", "outcomes_dir"]
-
         params = {}
-        for item in items:
+        for field in dataclasses.fields(cls):
+            item = field.name
             value = data.get(item)
             if not value:
                 raise ValueError(f"Must provide {item}.")
             path = pathlib.Path(value)
-            if not path.exists():
-                path.mkdir(exist_ok=True, parents=True)
+            # creating the folder is a no-op when it already exists
+            path.mkdir(exist_ok=True, parents=True)
             params[item] = path
 
         result = ConfigReports(**params)
@@ -187,14 +282,12 @@ class ConfigReports(BaseModel):
 
     def save_data(self) -> typing.Mapping:
         return {
-            "entries_dir": str(self.entries_dir.absolute()),
-            "permissions_dir": str(self.permissions_dir.absolute()),
-            "plans_dir": str(self.plans_dir.absolute()),
-            "outcomes_dir": str(self.outcomes_dir.absolute()),
+            field.name: str(getattr(self, field.name).absolute())
+            for field in dataclasses.fields(self)
         }
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class ConfigActions(BaseModel):
     """The action configuration."""
 
@@ -216,16 +309,13 @@ class ConfigActions(BaseModel):
 
     @classmethod
     def load_data(cls, data: typing.Mapping) -> "ConfigActions":
-        items = [field.name for field in dataclasses.fields(cls)]
         params = {}
-        for item in items:
+        for field in dataclasses.fields(cls):
+            item = field.name
             value = data.get(item, False)
-            if value is True or value == "true" or value == "True":
-                params[item] = True
-            elif value is False or value == "false" or value == "False":
-                params[item] = False
-            else:
-                params[item] = value
+            if field.type is bool:
+                value = cls.load_bool(value)
+            params[item] = value
 
         return ConfigActions(**params)
 
@@ -237,7 +327,7 @@ class ConfigActions(BaseModel):
         return result
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class ConfigAccount(BaseModel):
     """The account configuration."""
 
@@ -291,7 +381,81 @@ class ConfigAccount(BaseModel):
         }
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
+class ConfigPerformance(BaseModel):
+    """The performance configuration.
+
+    All settings are optional, the defaults send one request at a time.
+    """
+
+    batch_permissions: bool = False
+    """Whether to get the permissions for the entries in a folder
+    using batch requests, instead of one request per entry."""
+    num_workers: int = 1
+    """The number of threads used to get folder contents and send batch requests.
+    The default of 1 sends one request at a time."""
+    operations_per_batch: int = 50
+    """The number of operations to send in each batch request.
+    Must be between 1 and 100."""
+    requests_per_second: float = 10.0
+    """The sustained number of requests sent per second.
+    Use 0 to send requests without a limit."""
+    requests_burst: int = 100
+    """The number of requests that can be sent at once
+    before the requests per second limit applies."""
+    folders_per_request: int = 1
+    """The number of folders to get the contents of in each list request.
+    Must be between 1 and 100."""
+    batch_folder_lists: bool = False
+    """Whether to get the contents of each group of folders
+    using a batch request with one list request per folder,
+    instead of one list request with a combined query."""
+    entries_buffer: int = 0
+    """The number of entries to get in the background
+    while earlier entries are processed.
+    The default of 0 gets each entry when it is needed."""
+
+    @classmethod
+    def load_data(cls, data: typing.Mapping) -> "ConfigPerformance":
+        params = {}
+        for field in dataclasses.fields(cls):
+            item = field.name
+            if item not in data:
+                continue
+            value = data.get(item)
+            if field.type is bool:
+                params[item] = cls.load_bool(value)
+            elif field.type in (int, float):
+                params[item] = cls.load_number(item, value, field.type)
+            else:
+                params[item] = value
+
+        result = ConfigPerformance(**params)
+
+        if result.num_workers < 1:
+            raise ValueError("The number of workers must be 1 or more.")
+        if not 1 <= result.operations_per_batch <= 100:
+            raise ValueError("The operations per batch must be between 1 and 100.")
+        if result.requests_per_second < 0:
+            raise ValueError("The requests per second must be 0 or more.")
+        if result.requests_burst < 1:
+            raise ValueError("The requests burst must be 1 or more.")
+        if not 1 <= result.folders_per_request <= 100:
+            raise ValueError("The folders per request must be between 1 and 100.")
+        if result.entries_buffer < 0:
+            raise ValueError("The entries buffer must be 0 or more.")
+
+        return result
+
+    def save_data(self) -> typing.Mapping:
+        items = [field.name for field in dataclasses.fields(self)]
+        result = {}
+        for item in items:
+            result[item] = getattr(self, item)
+        return result
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
 class ConfigProgram(BaseModel):
     """The program configuration."""
 
@@ -303,6 +467,10 @@ class ConfigProgram(BaseModel):
     """The actions config."""
     account: ConfigAccount
     """The account config."""
+    performance: ConfigPerformance = dataclasses.field(
+        default_factory=ConfigPerformance
+    )
+    """The performance config."""
 
     @property
     def num_retries(self) -> int:
@@ -320,6 +488,7 @@ class ConfigProgram(BaseModel):
             "reports": ConfigReports,
             "actions": ConfigActions,
             "account": ConfigAccount,
+            "performance": ConfigPerformance,
         }
 
         params = {}
@@ -335,6 +504,7 @@ class ConfigProgram(BaseModel):
             "reports": self.reports.save_data(),
             "actions": self.actions.save_data(),
             "account": self.account.save_data(),
+            "performance": self.performance.save_data(),
         }
 
     @classmethod
@@ -347,6 +517,10 @@ class ConfigProgram(BaseModel):
         Returns:
             The program config data.
         """
+        if orjson is not None:
+            raw = orjson.loads(path.read_bytes())
+            return cls.load_data(raw)
+
         with open(path, "rt", encoding="utf-8") as handle:
             raw = json.load(handle)
             return cls.load_data(raw)
@@ -360,11 +534,13 @@ class ConfigProgram(BaseModel):
         Returns:
             None
         """
+        # the config is written with json, so the file is formatted the same
+        # whether or not orjson is installed
         with open(path, "wt", encoding="utf-8") as file_handle:
             json.dump(self.save_data(), file_handle)
 
 
-@dataclasses.dataclass(frozen=True, order=True)
+@dataclasses.dataclass(frozen=True, order=True, slots=True)
 class GoogleDrivePermission(BaseModel):
     """A Google Drive permission that specifies access to an entry."""
 
@@ -401,6 +577,32 @@ class GoogleDrivePermission(BaseModel):
             The display name.
         """
 
+    # The text that represents the permission, which is not part of its identity.
+    _str: typing.Optional[str] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    _str_formats = {
+        GoogleDrivePermissionTypeOptions.USER: "{name} <{email}> ({role})",
+        GoogleDrivePermissionTypeOptions.GROUP: "{name} <{email}> ({role})",
+        GoogleDrivePermissionTypeOptions.DOMAIN: "{name} ({role})",
+        GoogleDrivePermissionTypeOptions.ANYONE: "anyone with link ({role})",
+    }
+    """The format of the text for each type of permission."""
+
+    def __post_init__(self) -> None:
+        # the permission is frozen, so set the text directly
+        str_format = self._str_formats.get(self.entry_type)
+        if str_format is None:
+            text = None
+        else:
+            text = str_format.format(
+                name=self.display_name,
+                email=self.user_email,
+                role=self.role.name,
+            )
+        object.__setattr__(self, "_str", text)
+
     @classmethod
     def load_data(cls, data: typing.Mapping) -> "GoogleDrivePermission":
         params = {}
@@ -410,58 +612,99 @@ class GoogleDrivePermission(BaseModel):
             raise ValueError("Permission must include 'id'.")
         params["entry_id"] = entry_id
 
-        entry_type = data.get("type")
-        if not entry_type:
+        type_value = data.get("type")
+        if not type_value:
             raise ValueError("Permission must include 'type'.")
-        entry_type = GoogleDrivePermissionTypeOptions(entry_type)
+        entry_type = _PERMISSION_TYPE_BY_VALUE.get(type_value)
+        if entry_type is None:
+            raise ValueError(f"Unknown permission type '{type_value}'.")
         params["entry_type"] = entry_type
 
         role = data.get("role")
         if not role:
             raise ValueError("Permission must include 'role'.")
-        params["role"] = GoogleDrivePermissionRoleOptions(role)
-
-        if entry_type in [
-            GoogleDrivePermissionTypeOptions.USER,
-            GoogleDrivePermissionTypeOptions.GROUP,
-        ]:
-            params["user_email"] = data.get("emailAddress")
+        role_option = _PERMISSION_ROLE_BY_VALUE.get(role)
+        if role_option is None:
+            raise ValueError(f"Unknown permission role '{role}'.")
+        params["role"] = role_option
 
+        # check the values before building the permission
         display_name = data.get("displayName")
         if display_name:
-            params["display_name"] = str(display_name)
+            params["display_name"] = cls.intern(str(display_name))
+        elif entry_type != GoogleDrivePermissionTypeOptions.ANYONE:
+            raise ValueError("Display name is not set.")
+
+        if entry_type in _PERMISSION_TYPES_EMAIL:
+            user_email = data.get("emailAddress")
+            if not user_email:
+                raise ValueError("User email must be set for type 'user' or 'group'.")
+            params["user_email"] = cls.intern(user_email)
 
         if entry_type == GoogleDrivePermissionTypeOptions.DOMAIN:
-            params["domain"] = data.get("domain")
-
-        result = GoogleDrivePermission(**params)
-
-        if not result.entry_type:
-            raise ValueError("Entry type is not set.")
-        if not result.role:
-            raise ValueError("Role is not set.")
-        if not result.entry_id:
-            raise ValueError("Entry id is not set.")
-        if (
-            not result.display_name
-            and result.entry_type != GoogleDrivePermissionTypeOptions.ANYONE
-        ):
-            raise ValueError("Display name is not set.")
-        if not result.user_email and result.entry_type in [
-            GoogleDrivePermissionTypeOptions.USER,
-            GoogleDrivePermissionTypeOptions.GROUP,
-        ]:
-            raise ValueError("User email must be set for type 'user' or 'group'.")
-        if not result.domain and result.entry_type in [
-            GoogleDrivePermissionTypeOptions.DOMAIN,
-        ]:
-            raise ValueError("Domain must be set for type 'domain'.")
+            domain = data.get("domain")
+            if not domain:
+                raise ValueError("Domain must be set for type 'domain'.")
+            params["domain"] = cls.intern(domain)
 
-        return result
+        return GoogleDrivePermission(**params)
+
+    @classmethod
+    def load_data_list(
+        cls, items: typing.Iterable[typing.Mapping]
+    ) -> tuple["GoogleDrivePermission", ...]:
+        """Load the permissions that have a known type and role.
+
+        A permission with an unknown type or role is logged and skipped,
+        so one unexpected permission does not stop getting the other entries.
+        A skipped permission is not changed or deleted.
+
+        Args:
+            items: The raw data for each permission.
+
+        Returns:
+            The permissions.
+        """
+        result = []
+        for data in items:
+            type_value = data.get("type")
+            role = data.get("role")
+            if (type_value and type_value not in _PERMISSION_TYPE_BY_VALUE) or (
+                role and role not in _PERMISSION_ROLE_BY_VALUE
+            ):
+                logger.warning(
+                    "Skipped permission '%s' with unknown type '%s' or role '%s'.",
+                    data.get("id"),
+                    type_value,
+                    role,
+                )
+                continue
+            result.append(cls.load_data(data))
+        return tuple(result)
 
     def save_data(self) -> typing.Mapping:
         raise NotImplementedError("Cannot save permission data.")
 
+    @classmethod
+    @functools.cache
+    def required_properties(cls) -> str:
+        """Get the properties required from the API to correctly populate
+        a permission instance.
+
+        Returns:
+            A list of API fields.
+        """
+        return ",".join(
+            [
+                "id",
+                "type",
+                "emailAddress",
+                "domain",
+                "role",
+                "displayName",
+            ]
+        )
+
     @classmethod
     def get_display_name(
         cls, permission: typing.Optional["GoogleDrivePermission"]
@@ -471,29 +714,16 @@ class GoogleDrivePermission(BaseModel):
         return "Unknown user name"
 
     def __str__(self) -> str:
-        entry_type = self.entry_type
-        role = self.role
-        name = self.display_name
-        email = self.user_email
-        if entry_type == GoogleDrivePermissionTypeOptions.USER:
-            return f"{name} <{email}> ({role.name})"
-
-        if entry_type == GoogleDrivePermissionTypeOptions.GROUP:
-            return f"{name} <{email}> ({role.name})"
-
-        if entry_type == GoogleDrivePermissionTypeOptions.DOMAIN:
-            return f"{name} ({role.name})"
-
-        if entry_type == GoogleDrivePermissionTypeOptions.ANYONE:
-            return f"anyone with link ({role.name})"
-
-        raise ValueError(f"Unknown type '{entry_type}'.")
+        result = self._str
+        if result is None:
+            raise ValueError(f"Unknown type '{self.entry_type}'.")
+        return result
 
     def __repr__(self) -> str:
         return str(self)
 
 
-@dataclasses.dataclass(frozen=True, order=True)
+@dataclasses.dataclass(frozen=True, order=True, slots=True)
 class GoogleDriveEntry(BaseModel):
     """A Google Drive file or folder."""
 
@@ -529,8 +759,8 @@ class GoogleDriveEntry(BaseModel):
     properties_app: typing.Mapping
     """A collection of arbitrary key-value pairs 
     that are private to the requesting app."""
-    permissions_all: list[GoogleDrivePermission]
-    """A list of permissions, normalised for both personal and business accounts."""
+    permissions_all: tuple[GoogleDrivePermission, ...]
+    """The permissions, normalised for both personal and business accounts."""
     trashed: bool
     """Whether the file has been trashed. Only the owner may trash a file."""
     account: ConfigAccount
@@ -538,10 +768,25 @@ class GoogleDriveEntry(BaseModel):
     view_link: typing.Optional[str] = None
     """A link for opening the file in an editor or viewer in a browser."""
     checksum_sha256: typing.Optional[str] = None
-    name_original: typing.Optional[str] = None
-    """The original filename of the uploaded content if available, 
-    or else the original value of the name field. 
-    This is only available for files with binary content in Google Drive."""
+
+    # Values derived from the fields, which are not part of the entry's identity.
+    _is_dir: bool = dataclasses.field(init=False, repr=False, compare=False)
+    _owner_users: typing.Optional[
+        tuple[GoogleDrivePermission, ...]
+    ] = dataclasses.field(init=False, repr=False, compare=False, default=None)
+    _str_permissions: typing.Optional[str] = dataclasses.field(
+        init=False, repr=False, compare=False, default=None
+    )
+    _str: typing.Optional[str] = dataclasses.field(
+        init=False, repr=False, compare=False, default=None
+    )
+    _permissions_by_email: typing.Optional[
+        dict[str, GoogleDrivePermission]
+    ] = dataclasses.field(init=False, repr=False, compare=False, default=None)
+
+    def __post_init__(self) -> None:
+        # the entry is frozen, so set the derived values directly
+        object.__setattr__(self, "_is_dir", self.mime_type == _MIME_TYPE_DIR)
 
     @property
     def is_dir(self) -> bool:
@@ -550,19 +795,15 @@ class GoogleDriveEntry(BaseModel):
         Returns:
             True if this entry is a folder.
         """
-        return self.mime_type == GoogleDriveEntry.mime_type_dir()
+        return self._is_dir
 
     @property
     def is_copy(self) -> bool:
-        prop_key = GoogleDrivePropertyKeyOptions.CUSTOM_ORIGINAL_FILE_ID.value
-        prop_value = self.custom_property(prop_key)
-        return prop_value and len(prop_value) > 0
+        return bool(self.properties_shared.get(_PROPERTY_KEY_ORIGINAL_FILE_ID))
 
     @property
     def is_original(self) -> bool:
-        prop_key = GoogleDrivePropertyKeyOptions.CUSTOM_COPY_FILE_ID.value
-        prop_value = self.custom_property(prop_key)
-        return prop_value and len(prop_value) > 0
+        return bool(self.properties_shared.get(_PROPERTY_KEY_COPY_FILE_ID))
 
     @property
     def entry_type(self) -> str:
@@ -580,9 +821,9 @@ class GoogleDriveEntry(BaseModel):
         if "fileMoverExtraPermissions" not in data:
             raise ValueError("Must include the response from permissions.list.")
 
-        included_permissions = [
-            GoogleDrivePermission.load_data(i) for i in (data.get("permissions") or [])
-        ]
+        included_permissions = GoogleDrivePermission.load_data_list(
+            data.get("permissions") or []
+        )
 
         params = {
             "permissions_all": included_permissions,
@@ -597,26 +838,38 @@ class GoogleDriveEntry(BaseModel):
         ids: list[str] = data.get("parents", [])
         if len(ids) != 1:
             raise ValueError(f"Unexpected value for 'parents': '{ids}'.")
-        params["parent_id"] = ids[0]
+        # many entries have the same parent
+        params["parent_id"] = cls.intern(ids[0])
 
         date_created = data.get("createdTime")
         if date_created:
-            params["date_created"] = datetime.fromisoformat(date_created)
+            params["date_created"] = cls.parse_date(date_created)
 
         date_modified = data.get("modifiedTime")
         if date_modified:
-            params["date_modified"] = datetime.fromisoformat(date_modified)
+            params["date_modified"] = cls.parse_date(date_modified)
 
         params["name"] = data.get("name")
         params["description"] = data.get("description")
-        params["mime_type"] = data.get("mimeType")
+        params["mime_type"] = cls.intern(data.get("mimeType"))
         params["view_link"] = data.get("webViewLink")
-        params["size_bytes"] = int(str(data.get("size", "0")))
-        params["quota_bytes"] = int(str(data.get("quotaBytesUsed", "0")))
+        # the API sends these numbers as text, int() accepts text or numbers
+        size = data.get("size")
+        params["size_bytes"] = int(size) if size else 0
+        quota_bytes = data.get("quotaBytesUsed")
+        params["quota_bytes"] = int(quota_bytes) if quota_bytes else 0
         params["checksum_sha256"] = data.get("sha256Checksum")
-        params["name_original"] = data.get("originalFilename")
-        params["properties_shared"] = data.get("properties", {})
-        params["properties_app"] = data.get("appProperties", {})
+        # the entry is frozen, so the properties are read-only
+        properties = data.get("properties")
+        params["properties_shared"] = (
+            types.MappingProxyType(properties) if properties else _EMPTY_PROPERTIES
+        )
+        app_properties = data.get("appProperties")
+        params["properties_app"] = (
+            types.MappingProxyType(app_properties)
+            if app_properties
+            else _EMPTY_PROPERTIES
+        )
         params["trashed"] = data.get("trashed", None)
 
         # drive_id = data.get("driveId")
@@ -633,32 +886,37 @@ class GoogleDriveEntry(BaseModel):
         permissions_list = data["fileMoverExtraPermissions"]
 
         entry_name = params["name"]
-        if set(included_permissions) != set(permissions_list):
-            set1 = set(included_permissions)
-            set2 = set(permissions_list)
-            set_diff = set1.symmetric_difference(set2)
+
+        # check that the permissions and permission ids are consistent,
+        # building each set only once
+        included_set = set(included_permissions)
+        permissions_list_set = set(permissions_list)
+        permissions_match = included_set == permissions_list_set
+        if not permissions_match:
+            set_diff = included_set.symmetric_difference(permissions_list_set)
             logger.error(
                 f"Included permissions for '{entry_name}' ({entry_id}) "
                 "do not match permissions list. Difference: "
                 f"'{set_diff}'."
             )
 
-        included_permissions_ids = [i.entry_id for i in included_permissions]
-        if sorted(permission_ids) != sorted(included_permissions_ids):
-            set1 = set(permission_ids)
-            set2 = set(included_permissions_ids)
-            set_diff = set1.symmetric_difference(set2)
+        permission_ids_set = set(permission_ids)
+
+        included_ids_set = {i.entry_id for i in included_set}
+        if permission_ids_set != included_ids_set:
+            set_diff = permission_ids_set.symmetric_difference(included_ids_set)
             logger.error(
                 f"Included permission ids for '{entry_name}' ({entry_id}) "
                 "do not match permission ids. Difference: "
                 f"'{set_diff}'."
             )
 
-        permissions_list_ids = [i.entry_id for i in permissions_list]
-        if sorted(permission_ids) != sorted(permissions_list_ids):
-            set1 = set(permission_ids)
-            set2 = set(permissions_list_ids)
-            set_diff = set1.symmetric_difference(set2)
+        if permissions_match:
+            permissions_list_ids_set = included_ids_set
+        else:
+            permissions_list_ids_set = {i.entry_id for i in permissions_list_set}
+        if permission_ids_set != permissions_list_ids_set:
+            set_diff = permission_ids_set.symmetric_difference(permissions_list_ids_set)
             logger.error(
                 f"Permission list ids for '{entry_name}' ({entry_id}) "
                 "do not match permission ids Difference: "
@@ -686,15 +944,18 @@ class GoogleDriveEntry(BaseModel):
         Returns:
             The owner permission, if available.
         """
-        role_owner = GoogleDrivePermissionRoleOptions.OWNER
-        perm_type_user = GoogleDrivePermissionTypeOptions.USER
-        owners = []
-        for permission in self.permissions_all:
-            if permission.role != role_owner:
-                continue
-            if permission.entry_type != perm_type_user:
-                continue
-            owners.append(permission)
+        owners = self._owner_users
+        if owners is None:
+            role_owner = GoogleDrivePermissionRoleOptions.OWNER
+            perm_type_user = GoogleDrivePermissionTypeOptions.USER
+            owners = tuple(
+                permission
+                for permission in self.permissions_all
+                # enum members are singletons
+                if permission.role is role_owner
+                and permission.entry_type is perm_type_user
+            )
+            object.__setattr__(self, "_owner_users", owners)
 
         if len(owners) < 1:
             raise ValueError(
@@ -720,10 +981,15 @@ class GoogleDriveEntry(BaseModel):
         Returns:
             The matching permission, if available.
         """
-        for permission in self.permissions_all:
-            if permission.user_email == email:
-                return permission
-        return None
+        by_email = self._permissions_by_email
+        if by_email is None:
+            by_email = {}
+            for permission in self.permissions_all:
+                # keep the first permission for each email address
+                if permission.user_email:
+                    by_email.setdefault(permission.user_email, permission)
+            object.__setattr__(self, "_permissions_by_email", by_email)
+        return by_email.get(email)
 
     @property
     def str_permissions(self) -> str:
@@ -732,9 +998,34 @@ class GoogleDriveEntry(BaseModel):
         Returns:
             A string representation of this entry's permissions.
         """
-        count = len(self.permissions_all)
-        display = "; ".join(sorted(str(p) for p in self.permissions_all))
-        return f"{count} permissions [{display}]"
+        result = self._str_permissions
+        if result is None:
+            count = len(self.permissions_all)
+            display = "; ".join(sorted(str(p) for p in self.permissions_all))
+            result = f"{count} permissions [{display}]"
+            object.__setattr__(self, "_str_permissions", result)
+        return result
+
+    @classmethod
+    def parse_date(cls, value: str) -> datetime:
+        """Parse a date and time from the Google Drive API.
+
+        The API uses RFC 3339 timestamps, such as '2023-03-24T12:05:33.324Z'.
+
+        Args:
+            value: The timestamp text.
+
+        Returns:
+            The date and time.
+        """
+        try:
+            # the built-in parser is the fastest option
+            return datetime.fromisoformat(value)
+        except ValueError:
+            # before Python 3.11, the parser does not accept the 'Z' suffix
+            if value.endswith("Z"):
+                return datetime.fromisoformat(f"{value[:-1]}+00:00")
+            raise
 
     @classmethod
     def mime_type_dir(cls) -> str:
@@ -743,9 +1034,10 @@ class GoogleDriveEntry(BaseModel):
         Returns:
             Folder mime type.
         """
-        return "application/vnd.google-apps.folder"
+        return _MIME_TYPE_DIR
 
     @classmethod
+    @functools.cache
     def required_properties(cls) -> str:
         """Get the properties required from the API to correctly populate an entry
         instance.
@@ -757,10 +1049,9 @@ class GoogleDriveEntry(BaseModel):
             [
                 "id",
                 "name",
-                "originalFilename",
                 "mimeType",
                 "parents",
-                "permissions",
+                f"permissions({GoogleDrivePermission.required_properties()})",
                 "permissionIds",
                 "webViewLink",
                 "sha256Checksum",
@@ -813,9 +1104,13 @@ class GoogleDriveEntry(BaseModel):
         return permission_owner_user.user_email == email
 
     def __str__(self) -> str:
-        entry_type = self.entry_type
-        props = ";".join([f"{k}={v}" for k, v in self.properties_shared.items()])
-        return f"{entry_type} '{self.name}' (id {self.entry_id}) props '{props}'"
+        result = self._str
+        if result is None:
+            entry_type = self.entry_type
+            props = ";".join([f"{k}={v}" for k, v in self.properties_shared.items()])
+            result = f"{entry_type} '{self.name}' (id {self.entry_id}) props '{props}'"
+            object.__setattr__(self, "_str", result)
+        return result
 
     def __repr__(self) -> str:
         return str(self)
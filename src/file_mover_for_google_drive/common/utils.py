@@ -1,7 +1,10 @@
 """Utility functions."""
 import pathlib
+import queue
 import signal
 import logging
+import threading
+import time
 import typing
 from importlib import metadata, resources
 import types
@@ -56,17 +59,119 @@ def get_test_resources() -> pathlib.Path:
         return file_path
 
 
+def iter_buffered(
+    iterable: typing.Iterable[typing.Any], size: int
+) -> typing.Generator[typing.Any, typing.Any, None]:
+    """Get the items from an iterable using a background thread,
+    so the next items are obtained while the current item is processed.
+
+    Args:
+        iterable: The items to get.
+        size: The maximum number of items to get ahead.
+
+    Returns:
+        A generator of the items, in the same order.
+    """
+    items: queue.Queue = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    done = object()
+
+    def _put(value: tuple[typing.Any, typing.Optional[Exception]]) -> bool:
+        # wait for space, unless the items are no longer needed
+        while not stop.is_set():
+            try:
+                items.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in iterable:
+                if not _put((item, None)):
+                    return
+            _put((done, None))
+        except Exception as error:
+            _put((done, error))
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=_produce, name="file-mover-buffer", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
 class GracefulExit:
-    """Capture Ctrl + C (default KeyboardInterrupt)
-    via SIGINT and allow graceful exit."""
+    """Capture Ctrl + C (default KeyboardInterrupt) via SIGINT,
+    and a request to stop via SIGTERM, and allow graceful exit."""
 
     # https://stackoverflow.com/a/57649638/31567
 
+    _signals = [signal.SIGINT, signal.SIGTERM]
+    """The signals that request the program to exit."""
+
     def __init__(self) -> None:
         """Create a new graceful exit instance."""
-        self.state = False
-        # when a SIGINT occurs, run the change_state method
-        signal.signal(signal.SIGINT, self.change_state)
+        self._event = threading.Event()
+        # keep the handlers that were in place, so they can be restored on close
+        self._previous = {i: signal.getsignal(i) for i in self._signals}
+        # when a SIGINT or SIGTERM occurs, run the change_state method
+        for signum in self._signals:
+            signal.signal(signum, self.change_state)
+
+    def close(self) -> None:
+        """Restore the signal handlers that were in place before this instance.
+
+        Returns:
+            None
+        """
+        previous = self._previous
+        self._previous = {}
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    def __enter__(self) -> "GracefulExit":
+        """Enter the runtime context.
+
+        Returns:
+            The GracefulExit instance.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Exit the runtime context and restore the previous signal handlers.
+
+        Args:
+            exc_type: The exception type.
+            exc_val: The exception value.
+            exc_tb: The exception traceback.
+
+        Returns:
+            None
+        """
+        self.close()
+
+    @property
+    def state(self) -> bool:
+        """Whether a request to exit has been received.
+
+        Returns:
+            True if the program should exit.
+        """
+        return self._event.is_set()
 
     def change_state(
         self, signum: int, frame: typing.Optional[types.FrameType]  # noqa: W0613
@@ -91,11 +196,13 @@ class GracefulExit:
         print("===============================================================")
         print("")
 
-        # change to perform the default function for the signal
-        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        # change to perform the default function for the signals
+        for item in self._signals:
+            signal.signal(item, signal.SIG_DFL)
 
-        # set the flag to indicate the program should exit
-        self.state = True
+        # set the flag to indicate the program should exit,
+        # which is also visible to other threads
+        self._event.set()
 
     def should_exit(self) -> bool:
         """Should the code exit early?
@@ -103,7 +210,200 @@ class GracefulExit:
         Returns:
             True to exit early.
         """
-        return self.state
+        return self._event.is_set()
+
+
+class TokenBucket:
+    """Limit the rate of operations using a token bucket.
+
+    Tokens are added at a steady rate up to the burst size,
+    and each operation uses one or more tokens.
+    An operation waits when there are not enough tokens.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        recovery_seconds: float = 60.0,
+        clock: typing.Callable[[], float] = time.monotonic,
+        sleep: typing.Callable[[float], None] = time.sleep,
+    ):
+        """Create a new token bucket instance.
+
+        Args:
+            rate: The number of tokens added per second. Use 0 for no limit.
+            burst: The maximum number of tokens that can be stored.
+            recovery_seconds: The time to wait after reducing the rate
+                before restoring the full rate.
+            clock: Gets the current monotonic time in seconds.
+            sleep: Waits for a number of seconds.
+        """
+        if rate < 0:
+            raise ValueError("The rate must be 0 or more.")
+        if burst < 1:
+            raise ValueError("The burst must be 1 or more.")
+
+        self._rate_max = rate
+        self._rate = rate
+        self._burst = burst
+        self._recovery_seconds = recovery_seconds
+        self._recover_at: typing.Optional[float] = None
+        self._clock = clock
+        self._sleep = sleep
+
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Get the current number of tokens added per second.
+
+        Returns:
+            The current rate.
+        """
+        return self._rate
+
+    def acquire(self, weight: int = 1) -> None:
+        """Take tokens from the bucket, waiting until they are available.
+
+        Args:
+            weight: The number of tokens to take.
+
+        Returns:
+            None
+        """
+        if self._rate_max <= 0:
+            return
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+
+            # reserve the tokens, then wait for any shortfall to be added
+            self._tokens -= weight
+            wait_seconds = -self._tokens / self._rate if self._tokens < 0 else 0
+
+        if wait_seconds > 0:
+            self._sleep(wait_seconds)
+
+    def reduce_rate(self) -> None:
+        """Halve the rate, and restore the full rate after the recovery time.
+
+        Returns:
+            None
+        """
+        if self._rate_max <= 0:
+            return
+
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._rate = max(self._rate / 2, self._rate_max / 64)
+            self._recover_at = now + self._recovery_seconds
+
+        logger.warning("Reduced request rate to %.2f per second.", self._rate)
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accumulated since the last update.
+
+        Must be called while holding the lock.
+
+        Args:
+            now: The current monotonic time.
+
+        Returns:
+            None
+        """
+        if self._recover_at is not None and now >= self._recover_at:
+            self._rate = self._rate_max
+            self._recover_at = None
+
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(float(self._burst), self._tokens + elapsed * self._rate)
+
+
+class ConcurrencyLimit:
+    """Limit the number of operations that are in progress at the same time.
+
+    The limit is halved when an operation is rate limited,
+    and increased by one after a number of operations that were not rate limited.
+    """
+
+    def __init__(self, limit_max: int, increase_after: int = 20):
+        """Create a new concurrency limit instance.
+
+        Args:
+            limit_max: The maximum number of operations in progress.
+            increase_after: The number of operations that were not rate limited
+                before the limit is increased.
+        """
+        if limit_max < 1:
+            raise ValueError("The maximum limit must be 1 or more.")
+        if increase_after < 1:
+            raise ValueError("The increase after count must be 1 or more.")
+
+        self._limit_max = limit_max
+        self._limit = limit_max
+        self._increase_after = increase_after
+        self._successes = 0
+        self._in_progress = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Get the current number of operations that can be in progress.
+
+        Returns:
+            The current limit.
+        """
+        return self._limit
+
+    def acquire(self) -> None:
+        """Wait until another operation can start.
+
+        Returns:
+            None
+        """
+        with self._condition:
+            while self._in_progress >= self._limit:
+                self._condition.wait()
+            self._in_progress += 1
+
+    def release(self, rate_limited: bool = False) -> None:
+        """Record that an operation has finished.
+
+        Args:
+            rate_limited: Whether the operation was rate limited.
+
+        Returns:
+            None
+        """
+        with self._condition:
+            self._in_progress -= 1
+            reduced = False
+
+            if rate_limited:
+                self._successes = 0
+                if self._limit > 1:
+                    self._limit = max(1, self._limit // 2)
+                    reduced = True
+            else:
+                self._successes += 1
+                if (
+                    self._successes >= self._increase_after
+                    and self._limit < self._limit_max
+                ):
+                    self._limit += 1
+                    self._successes = 0
+
+            self._condition.notify_all()
+            limit = self._limit
+
+        if reduced:
+            logger.warning("Reduced concurrent requests to %s.", limit)
 
 
 class GoogleDriveEntryCache:
@@ -117,6 +417,9 @@ class GoogleDriveEntryCache:
         """
         self._top_folder_id = top_folder_id
         self._cache: dict[str, models.GoogleDriveEntry] = {}
+        # The full path of each folder that has been resolved,
+        # so the path of a child only needs the path of its parent.
+        self._folder_paths: dict[str, tuple[models.GoogleDriveEntry, ...]] = {}
 
     def add(self, entry: models.GoogleDriveEntry) -> None:
         """Add an entry to the cache.
@@ -127,7 +430,12 @@ class GoogleDriveEntryCache:
         Returns:
             None
         """
-        self._cache[entry.entry_id] = entry
+        entry_id = entry.entry_id
+        previous = self._cache.get(entry_id)
+        if previous is not None and previous != entry:
+            # the paths that include the previous entry are no longer correct
+            self._folder_paths.clear()
+        self._cache[entry_id] = entry
 
     def get(self, entry_id: str) -> typing.Optional[models.GoogleDriveEntry]:
         """Get an entry from the cache.
@@ -152,7 +460,10 @@ class GoogleDriveEntryCache:
         Returns:
             The deleted instance or None if the id was not found.
         """
-        return self._cache.pop(entry_id, None)
+        result = self._cache.pop(entry_id, None)
+        if result is not None:
+            self._folder_paths.clear()
+        return result
 
     def path(self, entry_id: str) -> list[models.GoogleDriveEntry]:
         """Get the full path to the given entry id.
@@ -164,8 +475,15 @@ class GoogleDriveEntryCache:
             The full path represented by the entry objects.
         """
         result = []
+        parent_path: tuple[models.GoogleDriveEntry, ...] = ()
         current_id = entry_id
         while True:
+            # stop at the nearest folder with a known path
+            cached_path = self._folder_paths.get(current_id)
+            if cached_path is not None:
+                parent_path = cached_path
+                break
+
             entry = self._cache.get(current_id)
             if not entry:
                 raise ValueError(f"Could not get entry id '{current_id}'.")
@@ -178,4 +496,12 @@ class GoogleDriveEntryCache:
             current_id = entry.parent_id
 
         result.reverse()
-        return result
+
+        # store the paths of the folders that were resolved
+        path = parent_path
+        for entry in result:
+            path = (*path, entry)
+            if entry.is_dir:
+                self._folder_paths[entry.entry_id] = path
+
+        return [*parent_path, *result]
@@ -0,0 +1,865 @@
+import copy
+import dataclasses
+import re
+import threading
+
+import httplib2
+import pytest
+from googleapiclient import http
+from googleapiclient.errors import HttpError
+
+from file_mover_for_google_drive.common import interact, models
+
+
+def build_error(status: int, content: bytes = b"") -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+class FakeRequest:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def execute(self, **params):
+        self.calls.append(params)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FakeBatch(http.BatchHttpRequest):
+    def __init__(self, sent, callback=None):
+        super().__init__(
+            callback=callback, batch_uri="https://www.googleapis.com/batch/drive/v3"
+        )
+        self.sent = sent
+
+    def add(self, request, callback=None, request_id=None):
+        self._order.append(request_id)
+        self._requests[request_id] = request
+
+    def execute(self, http=None):
+        self.sent.append(list(self._order))
+        for request_id in self._order:
+            request = self._requests[request_id]
+            request.calls.append({"http": http})
+            outcome = request.outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                self._callback(request_id, None, outcome)
+            else:
+                self._callback(request_id, outcome, None)
+
+
+class FakeResource:
+    def __init__(self):
+        self.sent = []
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self.sent, callback=callback)
+
+
+class FakeClient:
+    def __init__(self, resource=None, can_build_http=True):
+        self.resource = resource or FakeResource()
+        self.can_build_http = can_build_http
+
+    def client(self):
+        return self.resource
+
+    def new_http(self):
+        return object() if self.can_build_http else None
+
+
+def build_pages(count: int):
+    pages = [
+        FakeRequest({"files": [f"{index}a", f"{index}b"]}) for index in range(count)
+    ]
+
+    def _list_next(request, response):
+        index = pages.index(request) + 1
+        return pages[index] if index < len(pages) else None
+
+    return pages, _list_next
+
+
+def prefetch_threads():
+    return [i for i in threading.enumerate() if i.name.startswith("file-mover-pre")]
+
+
+class FakeDriveRequest:
+    def __init__(self, method: str, params: dict):
+        self.method = method
+        self.params = params
+
+
+class FakeDrive:
+    """An in-memory drive that provides the api used by the actions."""
+
+    _parent_pattern = re.compile(r"'((?:[^'\\]|\\.)*)' in parents")
+
+    def __init__(self, config, entries, include_permissions=True):
+        self.config = config
+        self.entries = {entry["id"]: entry for entry in entries}
+        self.permissions = {
+            entry["id"]: [build_permission_data(i) for i in entry["permissionIds"]]
+            for entry in entries
+        }
+        self.include_permissions = include_permissions
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def files_get(self, **params):
+        return FakeDriveRequest("files.get", params)
+
+    def files_list(self, **params):
+        return FakeDriveRequest("files.list", params)
+
+    def files_update(self, **params):
+        return FakeDriveRequest("files.update", params)
+
+    def permissions_delete(self, **params):
+        return FakeDriveRequest("permissions.delete", params)
+
+    def permissions_list(self, **params):
+        return FakeDriveRequest("permissions.list", params)
+
+    def execute_single(self, request):
+        self._send(request)
+        params = request.params
+        entry = self.entries[params["fileId"]]
+        if request.method == "files.update":
+            entry.update(params.get("body") or {})
+            if "addParents" in params:
+                entry["parents"] = [params["addParents"]]
+        elif request.method == "permissions.delete":
+            entry["permissionIds"].remove(params["permissionId"])
+            self.permissions[entry["id"]] = [
+                i
+                for i in self.permissions[entry["id"]]
+                if i["id"] != params["permissionId"]
+            ]
+            return {}
+        return self._entry_data(entry)
+
+    def execute_files_list(self, request):
+        self._send(request)
+        query = request.params["q"]
+        parent_ids = [
+            re.sub(r"\\(.)", r"\1", i) for i in self._parent_pattern.findall(query)
+        ]
+        entries = [i for i in self.entries.values() if i["parents"][0] in parent_ids]
+        entries.sort(key=lambda i: (i["mimeType"] != _FOLDER, i["name"]))
+        return [self._entry_data(entry) for entry in entries]
+
+    def execute_permissions_list(self, request):
+        self._send(request)
+        return copy.deepcopy(self.permissions[request.params["fileId"]])
+
+    def execute_files_list_batch(self, requests):
+        return {k: self.execute_files_list(v) for k, v in requests.items()}, {}
+
+    def execute_permissions_list_batch(self, requests):
+        return {k: self.execute_permissions_list(v) for k, v in requests.items()}, {}
+
+    def methods(self, method):
+        return [i.params for i in self.sent if i.method == method]
+
+    def _send(self, request):
+        with self.lock:
+            self.sent.append(request)
+
+    def _entry_data(self, entry):
+        result = copy.deepcopy(entry)
+        if self.include_permissions:
+            result["permissions"] = copy.deepcopy(self.permissions[entry["id"]])
+        return result
+
+
+_FOLDER = models.GoogleDriveEntry.mime_type_dir()
+
+
+def build_permission_data(permission_id: str):
+    return {
+        "id": permission_id,
+        "type": "user",
+        "emailAddress": f"{permission_id}@example.com",
+        "role": "owner" if permission_id == "owner" else "writer",
+        "displayName": permission_id,
+    }
+
+
+def build_entry_data(entry_id, parent_id, is_dir=False, permission_ids=("owner",)):
+    return {
+        "id": entry_id,
+        "name": entry_id,
+        "mimeType": _FOLDER if is_dir else "text/plain",
+        "parents": [parent_id],
+        "createdTime": "2023-03-24T12:05:33.324Z",
+        "modifiedTime": "2023-03-24T12:05:33.324Z",
+        "permissionIds": list(permission_ids),
+        "trashed": False,
+    }
+
+
+@pytest.fixture
+def build_actions(tmp_path, build_config):
+    def _build(entries, include_permissions=True, clock=None, **performance):
+        config = build_config(tmp_path, models.GoogleDriveAccountTypeOptions.PERSONAL)
+        config = dataclasses.replace(
+            config, performance=models.ConfigPerformance(**performance)
+        )
+        drive = FakeDrive(config, entries, include_permissions)
+        container = interact.GoogleDriveContainer(drive, config.account)
+        if clock is None:
+            return interact.GoogleDriveActions(container), drive
+        return interact.GoogleDriveActions(container, clock=clock), drive
+
+    return _build
+
+
+@pytest.fixture
+def build_api(tmp_path, build_config, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(interact.time, "sleep", sleeps.append)
+
+    def _build(gd_client=None, **performance):
+        config = build_config(tmp_path, models.GoogleDriveAccountTypeOptions.PERSONAL)
+        config = dataclasses.replace(
+            config,
+            performance=models.ConfigPerformance(
+                **{"requests_per_second": 0, **performance}
+            ),
+        )
+        api = interact.GoogleDriveApi(config, gd_client)
+        return api, sleeps
+
+    return _build
+
+
+def test_execute_request_retries_once_per_attempt(build_api):
+    # arrange
+    api, sleeps = build_api()
+    request = FakeRequest(*[build_error(429)] * 10)
+
+    # act
+    with pytest.raises(HttpError):
+        api._execute_request(request)
+
+    # assert
+    # the first attempt and one for each retry, without the client library retries
+    assert len(request.calls) == api.config.num_retries + 1
+    assert all(call == {"num_retries": 0} for call in request.calls)
+    assert len(sleeps) == api.config.num_retries
+
+
+def test_execute_request_retries_server_error(build_api):
+    # arrange
+    api, sleeps = build_api()
+    request = FakeRequest(build_error(503), ConnectionError(), {"id": "1"})
+
+    # act
+    response = api._execute_request(request)
+
+    # assert
+    assert response == {"id": "1"}
+    assert len(request.calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_execute_request_no_retry(build_api):
+    # arrange
+    api, sleeps = build_api()
+    not_found = FakeRequest(build_error(404))
+    rate_limited = FakeRequest(build_error(429))
+
+    # act
+    with pytest.raises(HttpError):
+        api._execute_request(not_found)
+    with pytest.raises(HttpError):
+        api._execute_request(rate_limited, retry=False)
+
+    # assert
+    assert len(not_found.calls) == 1
+    assert len(rate_limited.calls) == 1
+    assert sleeps == []
+
+
+def test_execute_batch_single_operation_retries_once_per_attempt(build_api):
+    # arrange
+    api, sleeps = build_api()
+    request = FakeRequest(*[build_error(429)] * 10)
+    results = []
+
+    def _callback(request_id, response, exception):
+        results.append((request_id, response, exception))
+
+    # act
+    api.execute_batch([request], _callback, request_ids=["a"])
+
+    # assert
+    # the rounds in execute_batch are the only retries
+    assert len(request.calls) == api.config.num_retries + 1
+    assert len(sleeps) == api.config.num_retries
+    assert len(results) == 1
+    assert results[0][0] == "a"
+    assert results[0][2].resp.status == 429
+
+
+def test_execute_batch_retry_round_and_callback_order(build_api):
+    # arrange
+    gd_client = FakeClient()
+    api, sleeps = build_api(gd_client, operations_per_batch=2)
+    requests = {
+        "a": FakeRequest({"id": "a"}),
+        "b": FakeRequest(build_error(429), {"id": "b"}),
+        "c": FakeRequest(build_error(404)),
+        "d": FakeRequest(build_error(403, b"userRateLimitExceeded"), {"id": "d"}),
+        "e": FakeRequest({"id": "e"}),
+    }
+    results = []
+
+    def _callback(request_id, response, exception):
+        results.append(
+            (request_id, response, exception.resp.status if exception else None)
+        )
+
+    # act
+    failed = api.execute_batch(
+        list(requests.values()), _callback, request_ids=list(requests.keys())
+    )
+
+    # assert
+    assert gd_client.resource.sent == [["a", "b"], ["c", "d"], ["b", "d"]]
+    assert results == [
+        ("a", {"id": "a"}, None),
+        ("c", None, 404),
+        ("e", {"id": "e"}, None),
+        ("b", {"id": "b"}, None),
+        ("d", {"id": "d"}, None),
+    ]
+    assert failed == {"c"}
+    assert len(sleeps) == 1
+    # the single operation in the last group is sent without a batch
+    assert requests["e"].calls == [{"num_retries": 0}]
+
+
+def test_execute_batch_retries_are_limited(build_api):
+    # arrange
+    gd_client = FakeClient()
+    api, sleeps = build_api(gd_client, operations_per_batch=2)
+    requests = [FakeRequest(*[build_error(429)] * 10) for _ in range(2)]
+    results = []
+
+    def _callback(request_id, response, exception):
+        results.append((request_id, exception.resp.status))
+
+    # act
+    failed = api.execute_batch(requests, _callback)
+
+    # assert
+    assert len(gd_client.resource.sent) == api.config.num_retries + 1
+    assert results == [("1", 429), ("2", 429)]
+    assert failed == {"1", "2"}
+    assert len(sleeps) == api.config.num_retries
+
+
+def test_execute_batch_parallel(build_api):
+    # arrange
+    gd_client = FakeClient()
+    api, sleeps = build_api(gd_client, operations_per_batch=5, num_workers=4)
+    request_ids = [f"id{index}" for index in range(20)]
+    requests = [
+        FakeRequest(build_error(429), {"id": request_id})
+        if index % 5 == 0
+        else FakeRequest({"id": request_id})
+        for index, request_id in enumerate(request_ids)
+    ]
+    results = {}
+
+    def _callback(request_id, response, exception):
+        assert exception is None
+        assert request_id not in results
+        results[request_id] = response
+
+    # act
+    failed = api.execute_batch(requests, _callback, request_ids=request_ids)
+
+    # assert
+    assert failed == set()
+    assert results == {request_id: {"id": request_id} for request_id in request_ids}
+    # four batches, then one retry batch with the four rate limited operations
+    assert len(gd_client.resource.sent) == 5
+    assert sorted(gd_client.resource.sent[-1]) == ["id0", "id10", "id15", "id5"]
+    # the batches sent by the worker threads use a transport for that thread
+    assert all(request.calls[0]["http"] is not None for request in requests)
+    assert len(sleeps) == 1
+
+
+def test_execute_batch_invalid_request_ids(build_api):
+    # arrange
+    api, _ = build_api(FakeClient())
+    requests = [FakeRequest(), FakeRequest()]
+
+    # act & assert
+    with pytest.raises(ValueError, match="Must provide one request id"):
+        api.execute_batch(requests, print, request_ids=["a"])
+    with pytest.raises(ValueError, match="Request ids must be unique."):
+        api.execute_batch(requests, print, request_ids=["a", "a"])
+
+
+def test_execute_pages_prefetch(build_api):
+    # arrange
+    api, _ = build_api(FakeClient(), num_workers=2)
+    pages, list_next = build_pages(3)
+
+    # act
+    with api:
+        items = list(api._execute_pages(pages[0], list_next, "files"))
+        threads = prefetch_threads()
+
+    # assert
+    assert items == ["0a", "0b", "1a", "1b", "2a", "2b"]
+    # the next pages are requested by a worker thread using its own transport
+    assert pages[0].calls == [{"num_retries": 0}]
+    assert all(page.calls[0]["http"] is not None for page in pages[1:])
+    assert threads
+    assert prefetch_threads() == []
+
+
+def test_execute_pages_no_prefetch_with_one_worker(build_api):
+    # arrange
+    api, _ = build_api(FakeClient())
+    pages, list_next = build_pages(3)
+
+    # act
+    items = list(api._execute_pages(pages[0], list_next, "files"))
+
+    # assert
+    assert items == ["0a", "0b", "1a", "1b", "2a", "2b"]
+    assert all(page.calls == [{"num_retries": 0}] for page in pages)
+    assert prefetch_threads() == []
+
+
+def test_execute_pages_closed_early(build_api):
+    # arrange
+    api, _ = build_api(FakeClient(), num_workers=2)
+    pages, list_next = build_pages(3)
+
+    # act
+    items = api._execute_pages(pages[0], list_next, "files")
+    first_item = next(items)
+    items.close()
+    api.close()
+
+    # assert
+    assert first_item == "0a"
+    assert pages[2].calls == []
+    assert prefetch_threads() == []
+
+
+@pytest.mark.parametrize(
+    "gd_client,performance",
+    [
+        (FakeClient(can_build_http=False), {"num_workers": 2}),
+        (FakeClient(can_build_http=False), {"entries_buffer": 10}),
+        (None, {"num_workers": 2}),
+    ],
+)
+def test_api_threads_require_thread_transport(build_api, gd_client, performance):
+    with pytest.raises(ValueError, match="Cannot send requests from more than"):
+        build_api(gd_client, **performance)
+
+
+def test_api_one_thread_without_thread_transport(build_api):
+    # arrange
+    api, _ = build_api(FakeClient(can_build_http=False))
+    pages, list_next = build_pages(2)
+
+    # act
+    with api:
+        items = list(api._execute_pages(pages[0], list_next, "files"))
+
+    # assert
+    assert items == ["0a", "0b", "1a", "1b"]
+    assert prefetch_threads() == []
+
+
+@pytest.mark.parametrize("include_permissions", [True, False])
+def test_actions_delete_permission_then_get(build_actions, include_permissions):
+    # arrange
+    entries = [build_entry_data("file", "top", permission_ids=["owner", "other"])]
+    actions, drive = build_actions(entries, include_permissions)
+
+    # act
+    before = actions.get_entry("file")
+    actions.delete_permission("file", "other")
+    after = actions.get_entry("file")
+
+    # assert
+    assert len(drive.methods("files.get")) == 2
+    if include_permissions:
+        assert [i.entry_id for i in before.permissions_all] == ["owner", "other"]
+        assert [i.entry_id for i in after.permissions_all] == ["owner"]
+        assert drive.methods("permissions.list") == []
+    else:
+        assert len(drive.methods("permissions.list")) == 2
+
+
+def test_actions_permissions_cache(build_actions):
+    # arrange
+    entries = [
+        build_entry_data("folder", "top", is_dir=True),
+        build_entry_data("file", "top", permission_ids=["owner", "other"]),
+    ]
+    actions, drive = build_actions(entries, include_permissions=False)
+
+    # act
+    list(actions.get_descendants("top"))
+    list(actions.get_descendants("top"))
+    permissions_unchanged = len(drive.methods("permissions.list"))
+
+    drive.entries["file"]["modifiedTime"] = "2023-03-25T12:05:33.324Z"
+    list(actions.get_descendants("top"))
+    permissions_modified = len(drive.methods("permissions.list"))
+
+    # sharing changes do not change the modified time
+    drive.entries["file"]["permissionIds"].remove("other")
+    list(actions.get_descendants("top"))
+    permissions_changed = len(drive.methods("permissions.list"))
+
+    # assert
+    # the permissions for the two entries are only requested once
+    assert permissions_unchanged == 2
+    # then again for the entry that was modified
+    assert permissions_modified == 3
+    # and again for the entry with different permission ids
+    assert permissions_changed == 4
+
+
+def test_actions_permissions_cache_expires(build_actions):
+    # arrange
+    now = [0.0]
+    entries = [build_entry_data("file", "top", permission_ids=["owner", "other"])]
+    actions, drive = build_actions(
+        entries, include_permissions=False, clock=lambda: now[0]
+    )
+    list(actions.get_descendants("top"))
+
+    # act
+    # changing a role does not change the modified time or permission ids
+    drive.permissions["file"][1]["role"] = "reader"
+    list(actions.get_descendants("top"))
+    permissions_before_expiry = len(drive.methods("permissions.list"))
+
+    now[0] += actions._permissions_cache_seconds + 1
+    list(actions.get_descendants("top"))
+    permissions_after_expiry = len(drive.methods("permissions.list"))
+
+    # assert
+    # the stored permissions are used until they expire
+    assert permissions_before_expiry == 1
+    assert permissions_after_expiry == 2
+
+
+@pytest.mark.parametrize("include_permissions", [True, False])
+def test_actions_descendants_unknown_permission(build_actions, include_permissions):
+    # arrange
+    entries = [
+        build_entry_data("folder", "top", is_dir=True),
+        build_entry_data("file", "folder", permission_ids=["owner", "other"]),
+    ]
+    actions, drive = build_actions(entries, include_permissions)
+    drive.permissions["file"][1]["type"] = "deviceGroup"
+
+    # act
+    result = list(actions.get_descendants("top"))
+
+    # assert
+    # the unknown permission is skipped instead of stopping the traversal
+    assert [i.entry_id for i in result] == ["folder", "file"]
+    assert [i.entry_id for i in result[1].permissions_all] == (
+        ["owner"] if include_permissions else []
+    )
+
+
+def test_actions_move_then_get(build_actions):
+    # arrange
+    entries = [
+        build_entry_data("folder", "top", is_dir=True),
+        build_entry_data("file", "top"),
+    ]
+    actions, drive = build_actions(entries)
+    folder = actions.get_entry("folder")
+    file = actions.get_entry("file")
+
+    # act
+    actions.move_entry(file, folder.entry_id)
+    moved = actions.get_entry("file")
+    folder_again = actions.get_entry("folder")
+
+    # assert
+    assert file.parent_id == "top"
+    assert moved.parent_id == "folder"
+    # moving an entry can change the inherited permissions of any entry
+    assert len(drive.methods("files.get")) == 3
+    assert folder_again == folder
+
+
+def test_actions_update_then_get(build_actions):
+    # arrange
+    actions, drive = build_actions([build_entry_data("file", "top")])
+    file = actions.get_entry("file")
+
+    # act
+    actions.rename_entry(file, "renamed")
+    renamed = actions.get_entry("file")
+    actions.update_properties(renamed, {"key": "value"})
+    updated = actions.get_entry("file")
+
+    # assert
+    assert renamed.name == "renamed"
+    assert dict(updated.properties_shared) == {"key": "value"}
+    # the updated details are in the update responses
+    assert len(drive.methods("files.get")) == 1
+
+
+def build_tree():
+    return [
+        build_entry_data("a", "top", is_dir=True),
+        build_entry_data("b", "top", is_dir=True),
+        build_entry_data("c", "top"),
+        build_entry_data("a1", "a", is_dir=True),
+        build_entry_data("a2", "a"),
+        build_entry_data("a1x", "a1"),
+        build_entry_data("b1", "b", is_dir=True),
+        build_entry_data("b2", "b"),
+        build_entry_data("b3", "b"),
+        build_entry_data("b1x", "b1", is_dir=True),
+        build_entry_data("b1xy", "b1x"),
+    ]
+
+
+_TREE_ORDER = ["a", "a1", "a1x", "a2", "b", "b1", "b1x", "b1xy", "b2", "b3", "c"]
+
+
+def test_actions_descendants_stack(build_actions):
+    # arrange
+    actions, drive = build_actions(build_tree())
+
+    # act
+    entries = list(actions.get_descendants("top"))
+
+    # assert
+    assert [i.entry_id for i in entries] == _TREE_ORDER
+    assert len(drive.methods("files.list")) == 6
+
+
+def test_actions_descendants_move_during_traversal(build_actions):
+    # arrange
+    actions, drive = build_actions(build_tree())
+
+    # act
+    entries = []
+    for entry in actions.get_descendants("top"):
+        entries.append(entry.entry_id)
+        if entry.entry_id == "b":
+            # move an entry that has been seen into a folder not yet listed
+            actions.move_entry(actions.get_entry("a2"), "b1")
+    gets_after_traversal = len(drive.methods("files.get"))
+    actions.get_entry("a")
+    actions.get_entry("b3")
+
+    # assert
+    # the moved entry is found again in the folder it was moved to
+    assert entries == [
+        "a", "a1", "a1x", "a2", "b", "b1", "b1x", "b1xy", "a2", "b2", "b3", "c"
+    ]  # fmt: skip
+    assert gets_after_traversal == 0
+    # a move forgets all stored entries, so the entry found before the move
+    # is requested again, while the entry found after the move is stored
+    assert len(drive.methods("files.get")) == 1
+
+
+@pytest.mark.parametrize("batch_folder_lists", [False, True])
+def test_actions_descendants_grouped(build_actions, batch_folder_lists):
+    # arrange
+    actions, drive = build_actions(
+        build_tree(), folders_per_request=3, batch_folder_lists=batch_folder_lists
+    )
+
+    # act
+    entries = list(actions.get_descendants("top"))
+
+    # assert
+    # the same order as the one folder per request traversal
+    assert [i.entry_id for i in entries] == _TREE_ORDER
+    queries = [i["q"] for i in drive.methods("files.list")]
+    if batch_folder_lists:
+        # one list request for each folder that has children
+        assert len(queries) == 6
+    else:
+        # the sibling folders that have been found are listed together
+        assert queries == [
+            "'top' in parents and trashed=false",
+            "('a' in parents or 'b' in parents) and trashed=false",
+            "'a1' in parents and trashed=false",
+            "'b1' in parents and trashed=false",
+            "'b1x' in parents and trashed=false",
+        ]
+
+
+def test_actions_descendants_grouped_ignores_other_folders(
+    build_actions, monkeypatch, caplog
+):
+    # arrange
+    tree = [*build_tree(), build_entry_data("other", "elsewhere")]
+    actions, drive = build_actions(tree, folders_per_request=3)
+    execute_files_list = drive.execute_files_list
+
+    def _execute_files_list(request):
+        result = execute_files_list(request)
+        if " or " in request.params["q"]:
+            # an entry in a folder that was not requested
+            result.append(drive._entry_data(drive.entries["other"]))
+        return result
+
+    monkeypatch.setattr(drive, "execute_files_list", _execute_files_list)
+
+    # act
+    entries = list(actions.get_descendants("top"))
+
+    # assert
+    assert [i.entry_id for i in entries] == _TREE_ORDER
+    assert (
+        "Ignoring entry 'other' in folder id 'elsewhere' that was not requested."
+        in caplog.messages
+    )
+
+
+def worker_threads():
+    return [i for i in threading.enumerate() if i.name.startswith("file-mover")]
+
+
+@pytest.mark.parametrize(
+    "performance",
+    [
+        {"num_workers": 3},
+        {"num_workers": 3, "folders_per_request": 2},
+        {"num_workers": 3, "batch_permissions": True},
+        {"entries_buffer": 2},
+        {"entries_buffer": 2, "num_workers": 2},
+    ],
+)
+def test_actions_descendants_concurrent(build_actions, performance):
+    # arrange
+    actions, drive = build_actions(build_tree(), **performance)
+
+    # act
+    entries = list(actions.get_descendants("top"))
+
+    # assert
+    # the same order as getting one folder at a time
+    assert [i.entry_id for i in entries] == _TREE_ORDER
+    assert worker_threads() == []
+
+
+@pytest.mark.parametrize("performance", [{"num_workers": 3}, {"entries_buffer": 2}])
+def test_actions_descendants_concurrent_error(build_actions, monkeypatch, performance):
+    # arrange
+    actions, drive = build_actions(build_tree(), **performance)
+    execute_files_list = drive.execute_files_list
+
+    def _execute_files_list(request):
+        if request.params["q"].startswith("'b1' in parents"):
+            raise ValueError("Could not list folder.")
+        return execute_files_list(request)
+
+    monkeypatch.setattr(drive, "execute_files_list", _execute_files_list)
+
+    # act
+    entries = []
+    with pytest.raises(ValueError, match="Could not list folder."):
+        for entry in actions.get_descendants("top"):
+            entries.append(entry.entry_id)
+
+    # assert
+    assert entries == ["a", "a1", "a1x", "a2", "b", "b1"]
+    assert worker_threads() == []
+
+
+@pytest.mark.parametrize("performance", [{"num_workers": 3}, {"entries_buffer": 2}])
+def test_actions_descendants_concurrent_closed_early(build_actions, performance):
+    # arrange
+    actions, drive = build_actions(build_tree(), **performance)
+
+    # act
+    entries = actions.get_descendants("top")
+    first_entries = [next(entries).entry_id for _ in range(2)]
+    entries.close()
+
+    # assert
+    assert first_entries == ["a", "a1"]
+    assert worker_threads() == []
+
+
+@pytest.fixture
+def container(tmp_path, build_config):
+    config = build_config(tmp_path, models.GoogleDriveAccountTypeOptions.PERSONAL)
+    drive = FakeDrive(config, [])
+    return interact.GoogleDriveContainer(drive, config.account)
+
+
+@pytest.mark.parametrize(
+    "folder_id,expected",
+    [
+        ("folder-1", r"'folder-1' in parents and trashed=false"),
+        ("it's", r"'it\'s' in parents and trashed=false"),
+        ("back\\slash", r"'back\\slash' in parents and trashed=false"),
+        ("\\'", r"'\\\'' in parents and trashed=false"),
+    ],
+)
+def test_container_get_children_query(container, folder_id, expected):
+    # act
+    request = container.get_children(folder_id)
+
+    # assert
+    assert request.method == "files.list"
+    assert request.params["q"] == expected
+
+
+def test_container_get_children_multi_query(container):
+    # act
+    request = container.get_children_multi(["a", "it's", "back\\slash"])
+
+    # assert
+    assert request.params["q"] == (
+        r"('a' in parents or 'it\'s' in parents or 'back\\slash' in parents)"
+        r" and trashed=false"
+    )
+
+
+@pytest.mark.parametrize(
+    "key,value,expected",
+    [
+        (
+            "key",
+            "value",
+            r"properties has { key='key' and value='value' } and trashed=false",
+        ),
+        (
+            "it's",
+            "C:\\folder\\it's",
+            r"properties has { key='it\'s' and value='C:\\folder\\it\'s' }"
+            r" and trashed=false",
+        ),
+    ],
+)
+def test_container_get_entries_by_property_query(container, key, value, expected):
+    # act
+    request = container.get_entries_by_property(key, value)
+
+    # assert
+    assert request.method == "files.list"
+    assert request.params["q"] == expected
+    assert request.params["pageSize"] == 2
@@ -0,0 +1,218 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from file_mover_for_google_drive.common import models
+
+
+def test_config_performance_load_data():
+    # act
+    result = models.ConfigPerformance.load_data(
+        {
+            "batch_permissions": "true",
+            "num_workers": "4",
+            "operations_per_batch": 20.0,
+            "requests_per_second": "2.5",
+        }
+    )
+
+    # assert
+    assert result.batch_permissions is True
+    assert result.num_workers == 4
+    assert result.operations_per_batch == 20
+    assert isinstance(result.operations_per_batch, int)
+    assert result.requests_per_second == 2.5
+
+
+@pytest.mark.parametrize(
+    "data,message",
+    [
+        ({"num_workers": 0}, "The number of workers must be 1 or more."),
+        ({"num_workers": -1}, "The number of workers must be 1 or more."),
+        ({"requests_per_second": -1}, "The requests per second must be 0 or more."),
+        ({"requests_burst": 0}, "The requests burst must be 1 or more."),
+        ({"requests_burst": -1}, "The requests burst must be 1 or more."),
+        (
+            {"operations_per_batch": 0},
+            "The operations per batch must be between 1 and 100.",
+        ),
+        (
+            {"operations_per_batch": -1},
+            "The operations per batch must be between 1 and 100.",
+        ),
+        (
+            {"operations_per_batch": 101},
+            "The operations per batch must be between 1 and 100.",
+        ),
+        (
+            {"folders_per_request": 0},
+            "The folders per request must be between 1 and 100.",
+        ),
+        (
+            {"folders_per_request": -1},
+            "The folders per request must be between 1 and 100.",
+        ),
+        (
+            {"folders_per_request": 101},
+            "The folders per request must be between 1 and 100.",
+        ),
+        ({"entries_buffer": -1}, "The entries buffer must be 0 or more."),
+        ({"num_workers": "two"}, "The num_workers must be a whole number, not 'two'."),
+        ({"num_workers": 1.5}, "The num_workers must be a whole number, not '1.5'."),
+        (
+            {"operations_per_batch": "ten"},
+            "The operations_per_batch must be a whole number, not 'ten'.",
+        ),
+        (
+            {"requests_per_second": "fast"},
+            "The requests_per_second must be a number, not 'fast'.",
+        ),
+        (
+            {"requests_per_second": "nan"},
+            "The requests_per_second must be a number, not 'nan'.",
+        ),
+        (
+            {"requests_burst": None},
+            "The requests_burst must be a whole number, not 'None'.",
+        ),
+        (
+            {"folders_per_request": True},
+            "The folders_per_request must be a whole number, not 'True'.",
+        ),
+        (
+            {"entries_buffer": "2.5"},
+            "The entries_buffer must be a whole number, not '2.5'.",
+        ),
+    ],
+)
+def test_config_performance_invalid(data, message):
+    with pytest.raises(ValueError, match=message):
+        models.ConfigPerformance.load_data(data)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (
+            "2023-03-24T12:05:33Z",
+            datetime(2023, 3, 24, 12, 5, 33, tzinfo=timezone.utc),
+        ),
+        (
+            "2023-03-24T12:05:33+00:00",
+            datetime(2023, 3, 24, 12, 5, 33, tzinfo=timezone.utc),
+        ),
+        (
+            "2023-03-24T12:05:33.324Z",
+            datetime(2023, 3, 24, 12, 5, 33, 324000, tzinfo=timezone.utc),
+        ),
+        (
+            "2023-03-24T22:05:33.5+10:00",
+            datetime(
+                2023, 3, 24, 22, 5, 33, 500000, tzinfo=timezone(timedelta(hours=10))
+            ),
+        ),
+    ],
+)
+def test_parse_date(value, expected):
+    # act
+    result = models.GoogleDriveEntry.parse_date(value)
+
+    # assert
+    assert result == expected
+    assert result.utcoffset() == expected.utcoffset()
+
+
+def test_parse_date_invalid():
+    with pytest.raises(ValueError):
+        models.GoogleDriveEntry.parse_date("24/03/2023")
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (True, True),
+        ("true", True),
+        ("True", True),
+        ("TRUE", True),
+        (False, False),
+        ("false", False),
+        ("False", False),
+        ("FALSE", False),
+        # other values are not converted
+        ("tRUE", "tRUE"),
+        ("yes", "yes"),
+        ("", ""),
+        (1, 1),
+        (None, None),
+    ],
+)
+def test_load_bool(value, expected):
+    # act
+    result = models.BaseModel.load_bool(value)
+
+    # assert
+    assert result == expected
+    assert type(result) is type(expected)
+
+
+def test_config_program_file_with_and_without_orjson(
+    tmp_path, monkeypatch, build_config
+):
+    # arrange
+    config = build_config(tmp_path, models.GoogleDriveAccountTypeOptions.PERSONAL)
+    path_fast = tmp_path / "config-orjson.json"
+    path_plain = tmp_path / "config-json.json"
+
+    # act
+    config.save_file(path_fast)
+    loaded_fast = models.ConfigProgram.load_file(path_fast)
+
+    monkeypatch.setattr(models, "orjson", None)
+    config.save_file(path_plain)
+    loaded_plain = models.ConfigProgram.load_file(path_plain)
+
+    # assert
+    assert path_fast.read_text(encoding="utf-8") == path_plain.read_text(
+        encoding="utf-8"
+    )
+    assert loaded_fast == config
+    assert loaded_plain == config
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"type": "deviceGroup", "role": "reader"},
+        {"type": "user", "role": "publishedReader"},
+    ],
+)
+def test_permission_load_data_list_skips_unknown(caplog, data):
+    # arrange
+    known = {
+        "id": "known",
+        "type": "user",
+        "role": "writer",
+        "displayName": "Known",
+        "emailAddress": "known@example.com",
+    }
+    unknown = {
+        "id": "unknown",
+        "displayName": "Unknown",
+        "emailAddress": "unknown@example.com",
+        **data,
+    }
+
+    # act
+    result = models.GoogleDrivePermission.load_data_list([unknown, known])
+
+    # assert
+    assert [i.entry_id for i in result] == ["known"]
+    assert caplog.messages == [
+        f"Skipped permission 'unknown' with unknown type '{data['type']}' "
+        f"or role '{data['role']}'."
+    ]
+
+
+def test_permission_load_data_list_invalid():
+    with pytest.raises(ValueError, match="Permission must include 'id'."):
+        models.GoogleDrivePermission.load_data_list([{"type": "user"}])
@@ -0,0 +1,324 @@
+import signal
+import threading
+
+import pytest
+
+from file_mover_for_google_drive.common import models, utils
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_burst_then_rate():
+    # arrange
+    fake = FakeClock()
+    bucket = utils.TokenBucket(rate=2, burst=2, clock=fake.clock, sleep=fake.sleep)
+
+    # act
+    for _ in range(4):
+        bucket.acquire()
+
+    # assert
+    assert fake.sleeps == [0.5, 0.5]
+    assert fake.now == 1.0
+
+
+def test_token_bucket_weight_and_burst_limit():
+    # arrange
+    fake = FakeClock()
+    bucket = utils.TokenBucket(rate=10, burst=5, clock=fake.clock, sleep=fake.sleep)
+
+    # act
+    bucket.acquire(5)
+    fake.now += 100
+    bucket.acquire(5)
+    bucket.acquire(2)
+
+    # assert
+    # the idle time only refills the bucket up to the burst size
+    assert fake.sleeps == [pytest.approx(0.2)]
+
+
+def test_token_bucket_reduce_and_recover_rate(caplog):
+    # arrange
+    fake = FakeClock()
+    bucket = utils.TokenBucket(
+        rate=8, burst=1, recovery_seconds=30, clock=fake.clock, sleep=fake.sleep
+    )
+
+    # act
+    bucket.reduce_rate()
+    bucket.reduce_rate()
+    rate_reduced = bucket.rate
+    bucket.acquire()
+    bucket.acquire()
+    fake.now += 30
+    bucket.acquire()
+    rate_recovered = bucket.rate
+
+    # assert
+    assert rate_reduced == 2
+    assert fake.sleeps == [0.5]
+    assert rate_recovered == 8
+    assert "Reduced request rate to 2.00 per second." in caplog.messages
+
+
+def test_token_bucket_no_limit():
+    # arrange
+    fake = FakeClock()
+    bucket = utils.TokenBucket(rate=0, burst=1, clock=fake.clock, sleep=fake.sleep)
+
+    # act
+    for _ in range(100):
+        bucket.acquire(10)
+    bucket.reduce_rate()
+
+    # assert
+    assert fake.sleeps == []
+    assert bucket.rate == 0
+
+
+@pytest.mark.parametrize(
+    "rate,burst,message",
+    [
+        (-1, 1, "The rate must be 0 or more."),
+        (1, 0, "The burst must be 1 or more."),
+    ],
+)
+def test_token_bucket_invalid(rate, burst, message):
+    with pytest.raises(ValueError, match=message):
+        utils.TokenBucket(rate=rate, burst=burst)
+
+
+def test_concurrency_limit_reduce_and_increase():
+    # arrange
+    limit = utils.ConcurrencyLimit(4, increase_after=2)
+    limits = []
+
+    # act
+    for rate_limited in [True, True, True, False, False, False, False, False]:
+        limit.acquire()
+        limit.release(rate_limited)
+        limits.append(limit.limit)
+
+    # assert
+    assert limits == [2, 1, 1, 1, 2, 2, 3, 3]
+
+
+def test_concurrency_limit_waits_for_release():
+    # arrange
+    limit = utils.ConcurrencyLimit(1)
+    acquired = threading.Event()
+
+    def _acquire():
+        limit.acquire()
+        acquired.set()
+        limit.release()
+
+    # act
+    limit.acquire()
+    thread = threading.Thread(target=_acquire)
+    thread.start()
+    waited = not acquired.wait(0.2)
+    limit.release()
+    thread.join(5)
+
+    # assert
+    assert waited
+    assert acquired.is_set()
+
+
+def test_concurrency_limit_invalid():
+    with pytest.raises(ValueError, match="The maximum limit must be 1 or more."):
+        utils.ConcurrencyLimit(0)
+    with pytest.raises(ValueError, match="The increase after count must be 1 or more."):
+        utils.ConcurrencyLimit(1, increase_after=0)
+
+
+def buffer_threads():
+    return [i for i in threading.enumerate() if i.name == "file-mover-buffer"]
+
+
+def test_iter_buffered_order():
+    # act
+    items = list(utils.iter_buffered(range(100), 3))
+
+    # assert
+    assert items == list(range(100))
+    assert buffer_threads() == []
+
+
+def test_iter_buffered_error():
+    # arrange
+    def _items():
+        yield 1
+        yield 2
+        raise ValueError("Could not get item.")
+
+    # act
+    items = []
+    with pytest.raises(ValueError, match="Could not get item."):
+        for item in utils.iter_buffered(_items(), 1):
+            items.append(item)
+
+    # assert
+    assert items == [1, 2]
+    assert buffer_threads() == []
+
+
+def test_iter_buffered_closed_early():
+    # arrange
+    produced = []
+    closed = threading.Event()
+
+    def _items():
+        try:
+            for index in range(1000):
+                produced.append(index)
+                yield index
+        finally:
+            closed.set()
+
+    # act
+    items = utils.iter_buffered(_items(), 2)
+    first_items = [next(items) for _ in range(3)]
+    items.close()
+
+    # assert
+    assert first_items == [0, 1, 2]
+    # the items are only obtained up to the buffer size ahead
+    assert len(produced) <= 6
+    assert closed.is_set()
+    assert buffer_threads() == []
+
+
+def test_graceful_exit_sigterm(capsys):
+    # arrange
+    signals = [signal.SIGINT, signal.SIGTERM]
+    previous = {signum: signal.getsignal(signum) for signum in signals}
+    try:
+        with utils.GracefulExit() as graceful_exit:
+            state_before = graceful_exit.state
+            handlers_before = [signal.getsignal(i) for i in signals]
+
+            # act
+            signal.raise_signal(signal.SIGTERM)
+
+            state_after = graceful_exit.state
+            should_exit = graceful_exit.should_exit()
+            handlers_after = [signal.getsignal(i) for i in signals]
+
+        # assert
+        assert state_before is False
+        assert handlers_before == [graceful_exit.change_state] * 2
+        assert state_after is True
+        assert should_exit is True
+        # a repeated request to exit stops immediately
+        assert handlers_after == [signal.SIG_DFL] * 2
+        # the previous handlers are restored on exit
+        assert {i: signal.getsignal(i) for i in signals} == previous
+        assert "Detected request to exit" in capsys.readouterr().out
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+def test_graceful_exit_close_without_signal():
+    # arrange
+    signals = [signal.SIGINT, signal.SIGTERM]
+    previous = {signum: signal.getsignal(signum) for signum in signals}
+    try:
+        graceful_exit = utils.GracefulExit()
+
+        # act
+        graceful_exit.close()
+        graceful_exit.close()
+
+        # assert
+        assert graceful_exit.state is False
+        assert {i: signal.getsignal(i) for i in signals} == previous
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+def build_entry(entry_id: str, parent_id: str, is_dir: bool = True):
+    account = models.ConfigAccount(
+        account_type=models.GoogleDriveAccountTypeOptions.PERSONAL,
+        drive_id=models.ConfigAccount.drive_name_my_drive(),
+        account_id="current@example.com",
+        top_folder_id="top",
+    )
+    mime_type = models.GoogleDriveEntry.mime_type_dir() if is_dir else "text/plain"
+    return models.GoogleDriveEntry.load_data(
+        {
+            "id": entry_id,
+            "name": entry_id,
+            "mimeType": mime_type,
+            "parents": [parent_id],
+            "createdTime": "2023-03-24T12:05:33.324Z",
+            "modifiedTime": "2023-03-24T12:05:33.324Z",
+            "trashed": False,
+            "fileMoverExtraAccount": account,
+            "fileMoverExtraPermissions": [],
+        }
+    )
+
+
+def test_entry_cache_path():
+    # arrange
+    cache = utils.GoogleDriveEntryCache("top")
+    for entry in [
+        build_entry("top", "root"),
+        build_entry("a", "top"),
+        build_entry("b", "top"),
+        build_entry("a1", "a"),
+        build_entry("file", "a1", is_dir=False),
+    ]:
+        cache.add(entry)
+
+    # act
+    path = cache.path("file")
+    path_again = cache.path("file")
+
+    # assert
+    assert [i.entry_id for i in path] == ["top", "a", "a1", "file"]
+    assert path_again == path
+
+
+def test_entry_cache_path_after_change():
+    # arrange
+    cache = utils.GoogleDriveEntryCache("top")
+    for entry in [
+        build_entry("top", "root"),
+        build_entry("a", "top"),
+        build_entry("b", "top"),
+        build_entry("a1", "a"),
+        build_entry("file", "a1", is_dir=False),
+    ]:
+        cache.add(entry)
+    path_before = cache.path("file")
+
+    # act
+    # move the folder that contains the file
+    cache.add(build_entry("a1", "b"))
+    path_moved = cache.path("file")
+
+    # a folder in the path is no longer available
+    cache.delete("b")
+    with pytest.raises(ValueError, match="Could not get entry id 'b'."):
+        cache.path("file")
+
+    # assert
+    assert [i.entry_id for i in path_before] == ["top", "a", "a1", "file"]
+    assert [i.entry_id for i in path_moved] == ["top", "b", "a1", "file"]